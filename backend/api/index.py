@@ -12,6 +12,6 @@ os.environ['VERCEL'] = '1'
 # Import Flask app - must be after setting path
 from app import create_app
 
-# Create Flask app instance
+# Create Flask app instance (maps the prebuilt catalog.bin instead of parsing JSON/CSV when present)
 app = create_app()
 
@@ -0,0 +1,154 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from catalog import AVAILABILITY_HISTORY_PATH
+
+
+HISTORY_SESSIONS = ('Fall', 'Winter', 'Spring', 'Summer')
+LISTED = 0x80  # Set for every course in a year's listing, offered or not
+
+# Predictor defaults: a year's weight halves every HALF_LIFE_YEARS, and
+# PARITY_WEIGHT of a prediction comes from years of the same parity only
+# (courses taught every other year)
+HALF_LIFE_YEARS = 3.0
+PARITY_WEIGHT = 0.5
+OFFERING_THRESHOLD = 0.5
+
+_history = None
+_history_signature = None
+_history_lock = threading.Lock()
+
+
+class AvailabilityHistory:
+    """Sessions every course ran in, for each academic year on record.
+
+    Stored as columns of one byte per course: masks[y, c] has bit k set when
+    courses[c] ran in sessions[k] during years[y], and LISTED when it was in
+    that year's listing at all. A course missing from a year (before it
+    existed, say) is no evidence that it wasn't offered.
+    """
+
+    def __init__(self, courses: Sequence[str] = (), years: Iterable[int] = (),
+                 masks: np.ndarray = None, sessions: Sequence[str] = HISTORY_SESSIONS) -> None:
+        if len(sessions) > 7:
+            raise ValueError("At most 7 sessions fit beside the LISTED bit")
+        self.courses = list(courses)
+        self.index = {course: i for i, course in enumerate(self.courses)}
+        self.years = np.asarray(list(years), dtype=np.int16)
+        self.masks = masks if masks is not None else np.zeros((len(self.years), len(self.courses)), dtype=np.uint8)
+        self.sessions = tuple(sessions)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def add_year(self, year: int, availability: Mapping[str, Sequence[str]]) -> None:
+        """Record (or replace) one year's {course: [sessions]} listing"""
+        new_courses = [course for course in availability if course not in self.index]
+        for course in new_courses:
+            self.index[course] = len(self.courses)
+            self.courses.append(course)
+        masks = np.pad(self.masks, ((0, 0), (0, len(new_courses))))
+
+        column = np.zeros(len(self.courses), dtype=np.uint8)
+        bit = {session: 1 << k for k, session in enumerate(self.sessions)}
+        for course, sessions in availability.items():
+            column[self.index[course]] = LISTED | sum(bit.get(s, 0) for s in set(sessions))
+
+        # Keep the columns in year order
+        at = int(np.searchsorted(self.years, year))
+        if at < len(self.years) and self.years[at] == year:
+            masks[at] = column
+        else:
+            masks = np.insert(masks, at, column, axis=0)
+            self.years = np.insert(self.years, at, year)
+        self.masks = masks
+
+    def availability(self, year: int) -> Dict[str, List[str]]:
+        """The recorded {course: [sessions]} listing of one year"""
+        at = int(np.searchsorted(self.years, year))
+        if at == len(self.years) or self.years[at] != year:
+            raise KeyError(year)
+        column = self.masks[at]
+        return {
+            self.courses[c]: [s for k, s in enumerate(self.sessions) if column[c] >> k & 1]
+            for c in np.flatnonzero(column & LISTED)
+        }
+
+    def save(self, path: str = AVAILABILITY_HISTORY_PATH) -> None:
+        # Write beside the target and rename, so readers never see a partial file
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, courses=np.array(self.courses, dtype=str), years=self.years,
+                     masks=self.masks, sessions=np.array(self.sessions, dtype=str))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = AVAILABILITY_HISTORY_PATH) -> 'AvailabilityHistory':
+        with np.load(path) as data:
+            return cls(data['courses'].tolist(), data['years'].tolist(), data['masks'], data['sessions'].tolist())
+
+
+def get_availability_history(path: str = AVAILABILITY_HISTORY_PATH) -> Optional[AvailabilityHistory]:
+    """The history store at `path`, loaded once per change on disk; None if there is none"""
+    global _history, _history_signature
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _history_lock:
+        if signature != _history_signature:
+            _history = AvailabilityHistory.load(path)
+            _history_signature = signature
+        return _history
+
+
+def predict_offerings(history: AvailabilityHistory, years: Sequence[int],
+                      half_life: float = HALF_LIFE_YEARS, parity_weight: float = PARITY_WEIGHT) -> np.ndarray:
+    """Probability each course runs in each session of each of `years`, shape (years, courses, sessions).
+
+    Per course and session, the share of the listed years it ran in, weighted
+    towards recent years and smoothed with one run and one miss (so a course
+    seen once is 2/3 likely, one never seen 1/2). `parity_weight` of it comes
+    from the years an even number of years from the target only.
+    """
+    if not len(history.years):
+        return np.full((len(years), len(history), len(history.sessions)), 0.5)
+
+    # (years on record, courses, sessions) of 0/1
+    offered = (history.masks[:, :, None] >> np.arange(len(history.sessions), dtype=np.uint8)) & 1
+    recency = 0.5 ** ((history.years.max() - history.years) / half_life)
+    weights = recency[:, None] * ((history.masks & LISTED) != 0)
+
+    def rate(w: np.ndarray) -> np.ndarray:
+        return (np.einsum('yc,ycs->cs', w, offered) + 1) / (w.sum(axis=0)[:, None] + 2)
+
+    overall = rate(weights)
+    by_parity = [rate(weights * (history.years % 2 == parity)[:, None]) for parity in (0, 1)]
+    blended = [parity_weight * by_parity[parity] + (1 - parity_weight) * overall for parity in (0, 1)]
+    return np.stack([blended[year % 2] for year in years])
+
+
+def predicted_availability(history: AvailabilityHistory, years: Sequence[int],
+                           threshold: float = OFFERING_THRESHOLD) -> List[Dict[str, List[str]]]:
+    """{course: [sessions]} per year: as recorded for years on record, otherwise
+    the sessions predicted at `threshold` or more"""
+    recorded = set(history.years.tolist())
+    future = [year for year in years if year not in recorded]
+    predicted = dict(zip(future, predict_offerings(history, future) >= threshold)) if future else {}
+
+    result = []
+    for year in years:
+        if year in recorded:
+            result.append(history.availability(year))
+            continue
+        likely = predicted[year]
+        result.append({
+            history.courses[c]: [s for k, s in enumerate(history.sessions) if likely[c, k]]
+            for c in np.flatnonzero(likely.any(axis=1))
+        })
+    return result
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark course search: the in-memory index against a scan of every course
+for the query as a substring of its code or title (what the ILIKE '%q%'
+query did, minus the database round trip).
+
+Courses come from the catalog JSON, copied --scale times under new course
+numbers for bigger catalogs:
+
+    python benchmarks/bench_course_search.py
+    python benchmarks/bench_course_search.py --scale 20 "compsci 16" algoritm
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_search import CourseSearchIndex
+from course_utils import find_prerequisites_file
+
+
+QUERIES = ['compsci 16', 'CS161', 'algoritm', 'machine lerning', 'I&C SCI 33', 'data structures', 'datab']
+
+
+def load_courses(scale: int) -> list:
+    with open(find_prerequisites_file(), encoding='utf-8') as f:
+        course_data = {name: info for name, info in json.load(f).items() if info}
+
+    courses = []
+    for copy in range(scale):
+        for class_name, info in course_data.items():
+            department, number = class_name.rsplit(' ', 1)
+            courses.append({
+                'id': len(courses),
+                'class_name': f'{department} {number}' if copy == 0 else f'{department} {copy}{number}',
+                'title': info.get('title', ''),
+                'description': info.get('description', ''),
+            })
+    return courses
+
+
+def substring_scan(courses: list, query: str, limit: int = 50) -> list:
+    query = query.lower()
+    return [c for c in courses if query in c['class_name'].lower() or query in c['title'].lower()][:limit]
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('queries', nargs='*', default=QUERIES)
+    parser.add_argument('--scale', type=int, default=1, help="copies of the catalog to index")
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    courses = load_courses(args.scale)
+    start = time.perf_counter()
+    index = CourseSearchIndex(courses)
+    print(f'{len(courses)} courses, {len(index.vocabulary)} words indexed in '
+          f'{(time.perf_counter() - start) * 1000:.0f} ms')
+
+    for query in args.queries:
+        scan = best_of(lambda: substring_scan(courses, query), args.repeat)
+        indexed = best_of(lambda: index.search(query), args.repeat)
+        top = [c['class_name'] for c in index.search(query, 3)]
+        print(f'  {query!r:<20} scan {scan * 1e6:8.0f} us ({len(substring_scan(courses, query)):2} hits)  '
+              f'index {indexed * 1e6:8.0f} us  top {top}')
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Benchmark cold-start cost of loading the availability CSV.
+
+Each measurement runs in a fresh interpreter so module imports are cold.
+Compares importing pandas and parsing with read_csv + iterrows against the
+streaming csv-module loader, on the real courses_availability.csv and on
+larger synthetic files, then times importing the Flask app.
+
+    python benchmarks/bench_csv_startup.py 10000 100000
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(BACKEND_DIR)
+
+from catalog_csv import write_availability_csv
+from synthetic_catalog import generate_catalog
+
+
+PANDAS_LOADER = """
+import time
+start = time.perf_counter()
+import pandas as pd
+imported = time.perf_counter()
+df = pd.read_csv(PATH)
+course_dict = {}
+for _, row in df.iterrows():
+    availability = row['Availability']
+    course_dict[row['Course']] = [] if pd.isnull(availability) else availability.split('+')
+print(imported - start, time.perf_counter() - imported)
+"""
+
+CSV_LOADER = """
+import time
+start = time.perf_counter()
+from catalog_csv import read_availability_csv
+imported = time.perf_counter()
+course_dict = read_availability_csv(PATH)
+print(imported - start, time.perf_counter() - imported)
+"""
+
+APP_IMPORT = """
+import contextlib, io, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import create_app
+    create_app()
+print(time.perf_counter() - start, 'pandas' in sys.modules)
+"""
+
+
+def run_fresh(source: str, path: str = '') -> list:
+    out = subprocess.run(
+        [sys.executable, '-c', source.replace('PATH', repr(path))],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return out
+
+
+def best_of(source: str, path: str, repeat: int = 3) -> tuple:
+    runs = [tuple(float(v) for v in run_fresh(source, path)) for _ in range(repeat)]
+    return min(runs, key=sum)
+
+
+def compare(label: str, path: str) -> None:
+    pd_import, pd_parse = best_of(PANDAS_LOADER, path)
+    csv_import, csv_parse = best_of(CSV_LOADER, path)
+    print(f'{label:>28}  pandas import {pd_import * 1000:7.1f} ms  parse {pd_parse * 1000:8.1f} ms  |  '
+          f'csv import {csv_import * 1000:5.1f} ms  parse {csv_parse * 1000:7.1f} ms  '
+          f'speedup {(pd_import + pd_parse) / (csv_import + csv_parse):5.1f}x')
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+
+    compare('courses_availability.csv', os.path.join(BACKEND_DIR, 'courses_availability.csv'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f'synthetic_{n}.csv')
+            availability, _ = generate_catalog(n)
+            write_availability_csv(path, availability)
+            compare(f'{n} synthetic courses', path)
+
+    seconds, pandas_loaded = run_fresh(APP_IMPORT)
+    print(f'create_app cold start {float(seconds) * 1000:.1f} ms  (pandas imported: {pandas_loaded})')
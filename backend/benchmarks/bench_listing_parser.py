@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Benchmark the course listing parser on full-campus (department=ALL) pages.
+
+Compares the old find/slice parser, which decodes the whole page to one
+string first, against iter_avail_listings fed 64 KiB chunks: best-of time
+and peak traced memory for each, plus how many records they disagree on.
+Uses recorded pages when given (<year>_ALL.html, see listing_stub_server.py),
+otherwise synthetic ones:
+
+    python benchmarks/bench_listing_parser.py --courses 5000 20000
+    python benchmarks/bench_listing_parser.py --pages recorded/
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(BACKEND_DIR)
+
+from listing_stub_server import load_recorded_pages, synthetic_pages
+from scraper import LISTING_CHUNK_SIZE, UCIScaperIdentifier, iter_avail_listings
+
+
+DEPARTMENTS = ['CS', 'INF', 'ICS', 'STA', 'SE', 'GDI', 'DAT', 'CSE', 'MATH']
+
+
+def legacy_parse(page: bytes, department: str = 'ALL') -> dict:
+    # The parser scrape_avail_listings used before the streaming one
+    uid = UCIScaperIdentifier()
+    html = page.decode(uid.decoder)
+    sidx = html.find(uid.stable)
+    eidx = html.find(uid.estable, sidx)
+
+    def strip(string: str) -> str:
+        return string.replace('"', '').replace(' ', '').replace('\n', '')
+
+    course_availability = {}
+
+    while True:
+        if sidx == -1 or eidx == -1:
+            break
+
+        aval_idx = html[sidx:html.find(uid.avail, sidx)]
+        availability = [s for s in uid.sessions if s in aval_idx]
+
+        info = html[sidx:eidx]
+
+        cidx = info.find(uid.course_idx)    # Skip first instance
+
+        cidx = info.find(uid.course_idx, cidx + 1)
+        ctitle = info[cidx + 11:cidx + 11 + len(department)]
+        ctitle = strip(ctitle)
+
+        nidx = info.find(uid.course_idx, cidx + 1)
+        cnum = info[nidx + 10:nidx + 16]
+        cnum = strip(cnum)
+
+        course_availability[ctitle + ' ' + cnum] = availability
+
+        sidx = html.find(uid.stable, eidx)
+        eidx = html.find(uid.estable, sidx)
+
+    return course_availability
+
+
+def streaming_parse(page: bytes) -> dict:
+    chunks = (page[i:i + LISTING_CHUNK_SIZE] for i in range(0, len(page), LISTING_CHUNK_SIZE))
+    return dict(iter_avail_listings(chunks))
+
+
+def measure(fn: Callable[[], dict], repeat: int) -> tuple:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Traced separately from timing, tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', help="directory of recorded <year>_ALL.html pages")
+    parser.add_argument('--courses', type=int, nargs='+', default=[2000, 20_000],
+                        help="synthetic courses per page")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = {f'{year}_ALL': page for (year, department), page in load_recorded_pages(args.pages).items()
+                 if department == 'ALL'}
+    else:
+        pages = {}
+        for n_courses in args.courses:
+            per_department = max(1, n_courses // len(DEPARTMENTS))
+            pages[f'{per_department * len(DEPARTMENTS)} courses'] = synthetic_pages([0], DEPARTMENTS, per_department)[('0', 'ALL')]
+
+    parsers: Dict[str, Callable[[bytes], dict]] = {'legacy': legacy_parse, 'streaming': streaming_parse}
+    for name, page in pages.items():
+        print(f'{name} ({len(page) / 2**20:.1f} MiB)')
+        results = {}
+        for parser_name, parse in parsers.items():
+            seconds, peak = measure(lambda: parse(page), args.repeat)
+            results[parser_name] = parse(page)
+            print(f'  {parser_name:<10} {seconds * 1000:9.1f} ms  peak {peak / 2**20:7.2f} MiB  '
+                  f'{len(results[parser_name])} courses')
+
+        # The old parser cut department codes to len('ALL') characters, e.g. MATH -> MAT
+        legacy, streaming = results['legacy'], results['streaming']
+        differ = sum(legacy.get(course) != sessions for course, sessions in streaming.items())
+        print(f'  {differ} of {len(streaming)} courses differ from the old parser')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Benchmark the planner's term-load and placement indexes on synthetic catalogs.
+
+Times the real CoursePlanner.build_plan against legacy_planner, a frozen copy
+of the placement loop from before the indexes, on the same catalogs, and
+reports whether both produce the same plan. Later planner changes (OR
+prerequisites, term windows) can place some courses differently.
+
+    python benchmarks/bench_planner_indexes.py 1000 2000 4000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import make_catalog_snapshot
+from legacy_planner import legacy_build_plan
+from planner import CoursePlanner
+from synthetic_catalog import SESSIONS, generate_catalog
+
+
+PLANNED_YEARS = 4
+
+
+def time_legacy_build_plan(availability: dict, prereqs_dag: dict, max_units: int, repeat: int) -> tuple:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        schedule = legacy_build_plan(availability, prereqs_dag, PLANNED_YEARS, max_units, SESSIONS)
+        times.append(time.perf_counter() - start)
+    return min(times), schedule
+
+
+def time_build_plan(catalog, availability: dict, max_units: int, repeat: int) -> tuple:
+    times = []
+    for _ in range(repeat):
+        planner = CoursePlanner(
+            data_path=None,
+            planned_years=PLANNED_YEARS,
+            max_units_per_sem=max_units,
+            sessions=SESSIONS,
+            catalog=catalog
+        )
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            planner.build_plan(availability)
+        times.append(time.perf_counter() - start)
+    return min(times), planner.schedule
+
+
+def run(n_courses: int, repeat: int) -> None:
+    availability, prereqs_dag = generate_catalog(n_courses)
+    catalog = make_catalog_snapshot(availability, prereqs_dag)
+
+    # Roomy terms so each one holds many courses, which is where scanning hurts
+    max_units = 4 * max(4, n_courses // (PLANNED_YEARS * len(SESSIONS)))
+    baseline_s, baseline_schedule = time_legacy_build_plan(availability, prereqs_dag, max_units, repeat)
+    current_s, schedule = time_build_plan(catalog, availability, max_units, repeat)
+
+    placed = sum(len(v) for v in schedule.values())
+    same = 'same plan' if schedule == baseline_schedule else 'plans differ'
+    print(f'{n_courses:>7} courses  placed {placed:>6}  build_plan baseline {baseline_s * 1000:9.1f} ms  '
+          f'current {current_s * 1000:9.1f} ms  speedup {baseline_s / max(current_s, 1e-9):6.1f}x  ({same})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sizes', type=int, nargs='*', default=[500, 1000, 2000, 4000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        run(n, args.repeat)
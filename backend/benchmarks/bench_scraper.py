@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Benchmark scraping many (year, department) listings from a local stub server.
+
+Compares one fresh connection per listing, fetched in sequence (how the
+scraper used to work), against scrape_listings' thread pool over pooled
+keep-alive connections, with simulated network latency and optional 503s.
+
+    python benchmarks/bench_scraper.py --years 2021 2022 2023 2024 --delay 0.05 --workers 8
+    python benchmarks/bench_scraper.py --fail-rate 0.2
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(BACKEND_DIR)
+
+from listing_stub_server import serve_listings, synthetic_pages
+from scraper import UCIScaperIdentifier, scrape_avail_listings, scrape_listings
+
+
+def sequential(years, departments, uid):
+    return {(year, department): scrape_avail_listings(year, department, uid=uid)
+            for year in years for department in departments}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, nargs='+', default=[2022, 2023, 2024])
+    parser.add_argument('--departments', nargs='+', default=['CS', 'INF', 'ICS', 'STA', 'MATH', 'SE', 'GDI', 'DAT'])
+    parser.add_argument('--courses', type=int, default=200, help="synthetic courses per department")
+    parser.add_argument('--delay', type=float, default=0.05, help="seconds of latency per request")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="chance a request gets a 503")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.years, args.departments, args.courses)
+    runs = {
+        'sequential': lambda uid: sequential(args.years, args.departments, uid),
+        f'scrape_listings x{args.workers}': lambda uid: scrape_listings(args.years, args.departments,
+                                                                       workers=args.workers, uid=uid),
+    }
+
+    results = {}
+    for name, run in runs.items():
+        with serve_listings(pages, delay=args.delay, fail_rate=args.fail_rate) as server:
+            uid = UCIScaperIdentifier(url_link=server.url)
+            start = time.perf_counter()
+            try:
+                results[name] = run(uid)
+            except Exception as e:
+                print(f'{name:<22} failed: {e}')
+                continue
+            seconds = time.perf_counter() - start
+            print(f'{name:<22} {seconds * 1000:9.1f} ms  {len(results[name]):>3} listings  '
+                  f'{server.requests:>4} requests  {server.connections:>3} connections')
+
+    if len(results) == len(runs):
+        first, second = results.values()
+        print('Results match' if first == second else 'Results differ')
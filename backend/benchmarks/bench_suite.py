@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for the planner and graph utilities on synthetic catalogs.
+
+For each catalog size, times CoursePlanner.build_plan, create_prerequisites_dag,
+create_forward_dag, topological_sort and dag_leveler (best of --repeat runs),
+measures each one's peak traced memory in a separate run, and writes everything
+as JSON so results can be compared between releases.
+
+    python benchmarks/bench_suite.py --sizes 500 2000 10000 100000 --output bench.json
+    python benchmarks/bench_suite.py --depth 16 --fan-in 3 --offer-rate 0.4
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(BACKEND_DIR)
+
+from catalog import make_catalog_snapshot
+from course_utils import create_forward_dag, create_prerequisites_dag
+from planner import CoursePlanner
+from synthetic_catalog import SESSIONS, generate_catalog, generate_prereq_json
+from utils import dag_leveler, topological_sort
+
+
+PLANNED_YEARS = 4
+
+
+def operations(n_courses: int, args: argparse.Namespace) -> Dict[str, Callable[[], object]]:
+    availability, prereqs_dag = generate_catalog(n_courses, depth=args.depth, fan_in=args.fan_in,
+                                                 seed=args.seed, offer_rate=args.offer_rate)
+    prereq_json = generate_prereq_json(prereqs_dag, seed=args.seed)
+    catalog = make_catalog_snapshot(availability, prereqs_dag)
+    max_units = 4 * max(4, n_courses // (PLANNED_YEARS * len(SESSIONS)))
+
+    def build_plan():
+        planner = CoursePlanner(
+            data_path=None,
+            planned_years=PLANNED_YEARS,
+            max_units_per_sem=max_units,
+            sessions=SESSIONS,
+            catalog=catalog
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            planner.build_plan(availability)
+        return planner.schedule
+
+    return {
+        'build_plan': build_plan,
+        'create_prerequisites_dag': lambda: create_prerequisites_dag(prereq_json),
+        'create_forward_dag': lambda: create_forward_dag(prereqs_dag),
+        'topological_sort': lambda: topological_sort(prereqs_dag),
+        'dag_leveler': lambda: dag_leveler(prereqs_dag),
+    }
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    # Traced separately from timing, tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run_suite(args: argparse.Namespace) -> List[dict]:
+    results = []
+    for n_courses in args.sizes:
+        for name, fn in operations(n_courses, args).items():
+            if args.only and name not in args.only:
+                continue
+            seconds = best_time(fn, args.repeat)
+            peak = peak_memory(fn)
+            results.append({
+                'operation': name,
+                'courses': n_courses,
+                'seconds': seconds,
+                'peakMemoryBytes': peak,
+            })
+            print(f'{n_courses:>7} courses  {name:<26} {seconds * 1000:10.1f} ms  peak {peak / 2**20:8.1f} MiB')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10_000])
+    parser.add_argument('--depth', type=int, default=8, help="prerequisite levels in the catalog")
+    parser.add_argument('--fan-in', type=int, default=2, help="prerequisites drawn per course")
+    parser.add_argument('--offer-rate', type=float, default=0.6, help="chance a course runs in each session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help="operations to run (default: all)")
+    parser.add_argument('--output', default='bench_results.json', help="where to write the JSON report")
+    args = parser.parse_args()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'depth': args.depth,
+            'fanIn': args.fan_in,
+            'offerRate': args.offer_rate,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'plannedYears': PLANNED_YEARS,
+            'sessions': SESSIONS,
+        },
+        'results': run_suite(args),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
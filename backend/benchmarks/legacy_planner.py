@@ -0,0 +1,75 @@
+"""
+Frozen copy of CoursePlanner's DFS placement from before it kept term-load
+and placement indexes, for bench_planner_indexes.py.
+
+It works on plain dicts so it keeps running as the planner, catalog and
+course graph change. Every placement re-sums the units of the candidate
+term and scans every term for each neighbor's placement, as the planner did.
+"""
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence
+
+
+def legacy_build_plan(availability: Mapping[str, Sequence[str]],
+                      prereq_dag: Mapping[str, Sequence[str]],
+                      planned_years: int,
+                      max_units_per_sem: int,
+                      sessions: Sequence[str],
+                      units: Mapping[str, int] = None,
+                      default_units: int = 4) -> Dict[str, List[str]]:
+    """Schedule every course in `availability`, returning {term: [courses]}"""
+    units = units or {}
+    forward_dag = {}
+    for course, prereqs in prereq_dag.items():
+        for p in prereqs:
+            forward_dag.setdefault(p, []).append(course)
+
+    session_val = {f'{s}{i}': i * len(sessions) + idx
+                   for i in range(planned_years) for idx, s in enumerate(sessions)}
+    schedule = {k: [] for k in session_val}
+    visited = set()
+
+    def units_of(course: str) -> int:
+        return units.get(course, default_units)
+
+    def build_plan_dfs(course: str) -> None:
+        if course in visited:
+            return
+
+        # First process all prerequisites
+        prereqs = prereq_dag.get(course, ())
+        for prereq in prereqs:
+            if prereq not in visited and prereq in availability:
+                build_plan_dfs(prereq)
+
+        visited.add(course)
+
+        def check_max_units(k: str) -> bool:
+            total_units = sum([units_of(c) for c in schedule[k]])
+            return total_units + units_of(course) <= max_units_per_sem
+
+        def get_score(base: int, edges: Iterable[str], extrema: Callable[[int, int], int]) -> int:
+            score = base
+            for code in edges:
+                for k, v in schedule.items():
+                    if code in v:
+                        score = extrema(score, session_val[k])
+            return score
+
+        min_window = get_score(-1, prereqs, max)
+        max_window = get_score(planned_years * len(sessions), forward_dag.get(course, ()), min)
+
+        if any(prereq not in visited for prereq in prereqs):
+            return  # Don't schedule this course if prerequisites aren't met
+
+        for i in range(planned_years):
+            for session in availability[course]:
+                k = f'{session}{i}'
+                if k not in session_val:
+                    continue
+                if check_max_units(k) and min_window < session_val[k] < max_window:
+                    schedule[k].append(course)
+                    return
+
+    for course in availability:
+        build_plan_dfs(course)
+    return schedule
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the course listing site, for testing and benchmarking the scraper.
+
+Serves recorded listing pages (files named <year>_<department>.html) or
+synthetic ones over keep-alive HTTP/1.1, with ETag/Last-Modified validators
+(answering conditional requests with 304), optional latency and random
+503s to exercise the scraper's retries:
+
+    python benchmarks/listing_stub_server.py --pages recorded/ --port 8765
+    python benchmarks/listing_stub_server.py --years 2023 2024 --departments CS INF --fail-rate 0.2
+
+then point the scraper at it with UCIScaperIdentifier(url_link=server.url).
+"""
+import argparse
+import contextlib
+import email.utils
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the backend modules
+sys.path.append(BACKEND_DIR)
+
+from synthetic_catalog import SESSIONS, generate_listing_page
+
+
+LISTING_PATH = '/ugrad_courses/listing-course.php'
+
+
+def load_recorded_pages(directory: str) -> Dict[Tuple[str, str], bytes]:
+    """Pages saved as <year>_<department>.html, keyed by (year, department)"""
+    pages = {}
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext == '.html' and '_' in stem:
+            year, department = stem.split('_', 1)
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages[(year, department)] = f.read()
+    return pages
+
+
+def synthetic_pages(years: Iterable[int], departments: Iterable[str], courses: int = 200,
+                    seed: int = 0) -> Dict[Tuple[str, str], bytes]:
+    """A synthetic listing of `courses` courses per (year, department), plus the department=ALL page"""
+    rng = random.Random(seed)
+    pages = {}
+    for year in years:
+        campus = {}
+        for department in departments:
+            availability = {
+                f'{department} {100 + k}': [s for s in SESSIONS if rng.random() < 0.6] or [rng.choice(SESSIONS)]
+                for k in range(courses)
+            }
+            pages[(str(year), department)] = generate_listing_page(availability, seed).encode()
+            campus.update(availability)
+        pages[(str(year), 'ALL')] = generate_listing_page(campus, seed).encode()
+    return pages
+
+
+class ListingStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages: Dict[Tuple[str, str], bytes], port: int = 0,
+                 delay: float = 0.0, fail_rate: float = 0.0, seed: int = 0,
+                 validators: bool = True) -> None:
+        self.pages = pages
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.validators = validators
+        self.started = email.utils.formatdate(usegmt=True)
+        self.requests = 0
+        self.connections = 0
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        super().__init__(('127.0.0.1', port), ListingHandler)
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that timed out hang up mid-response, which is what some runs want
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}{LISTING_PATH}'
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real site
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def send_page(self, status: int, body: bytes, headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server._lock:
+            self.server.bytes_sent += len(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server._lock:
+            server.requests += 1
+            fail = server._rng.random() < server.fail_rate
+        if server.delay:
+            time.sleep(server.delay)
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        key = (query.get('year', [''])[0], query.get('department', [''])[0])
+        if fail:
+            self.send_page(503, b'Service Unavailable')
+        elif url.path != LISTING_PATH or key not in server.pages:
+            self.send_page(404, b'Not Found')
+        elif not server.validators:
+            self.send_page(200, server.pages[key])
+        else:
+            # Pages only change when a run swaps them, so the content hash is a strong ETag
+            page = server.pages[key]
+            headers = {'ETag': f'"{hashlib.sha1(page).hexdigest()}"', 'Last-Modified': server.started}
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                self.send_page(304, b'', headers)
+            else:
+                self.send_page(200, page, headers)
+
+
+@contextlib.contextmanager
+def serve_listings(pages: Dict[Tuple[str, str], bytes], **options) -> Iterator[ListingStubServer]:
+    """Run a ListingStubServer on a free port in a background thread"""
+    server = ListingStubServer(pages, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', help="directory of recorded <year>_<department>.html pages")
+    parser.add_argument('--years', type=int, nargs='+', default=[2024])
+    parser.add_argument('--departments', nargs='+', default=['CS', 'INF', 'ICS', 'STA', 'MATH'])
+    parser.add_argument('--courses', type=int, default=200, help="synthetic courses per department")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds of latency per request")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="chance a request gets a 503")
+    parser.add_argument('--no-validators', action='store_true', help="send no ETag/Last-Modified")
+    args = parser.parse_args()
+
+    pages = load_recorded_pages(args.pages) if args.pages else synthetic_pages(args.years, args.departments, args.courses)
+    server = ListingStubServer(pages, args.port, args.delay, args.fail_rate, validators=not args.no_validators)
+    print(f'Serving {len(pages)} listing pages at {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,77 @@
+"""
+Synthetic course catalogs for benchmarking the planner and graph utilities.
+"""
+import random
+from typing import Dict, List, Sequence, Tuple
+
+
+SESSIONS = ['Fall', 'Winter', 'Spring']
+
+
+def generate_catalog(n_courses: int, depth: int = 8, fan_in: int = 2,
+                     sessions: Sequence[str] = SESSIONS, seed: int = 0,
+                     offer_rate: float = 0.6) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """Return (availability, prereqs_dag) for a layered catalog of n_courses.
+
+    Courses are split into `depth` levels; each course above level 0 takes up
+    to `fan_in` prerequisites from lower levels and is offered in each of
+    `sessions` with probability `offer_rate` (always in at least one).
+    """
+    rng = random.Random(seed)
+    codes = [f'SYN{k // 1000} {k % 1000}' for k in range(n_courses)]
+    level_size = max(1, -(-n_courses // depth))
+
+    availability = {}
+    prereqs_dag = {}
+    for k, code in enumerate(codes):
+        level_start = (k // level_size) * level_size
+        prereqs_dag[code] = [codes[p] for p in sorted(set(
+            rng.randrange(level_start) for _ in range(fan_in)
+        ))] if level_start else []
+        availability[code] = [s for s in sessions if rng.random() < offer_rate] or [rng.choice(sessions)]
+
+    return availability, prereqs_dag
+
+
+def generate_prereq_json(prereqs_dag: Dict[str, List[str]], or_rate: float = 0.25, seed: int = 0) -> dict:
+    """Logical prerequisite structures for a synthetic DAG, shaped like the parsed JSON catalog.
+
+    Each course's prerequisites are ANDed; with probability `or_rate` a pair of
+    them is grouped as an OR.
+    """
+    rng = random.Random(seed)
+    structures = {}
+    for course, prereqs in prereqs_dag.items():
+        if not prereqs:
+            continue
+        items = list(prereqs)
+        if len(items) > 1 and rng.random() < or_rate:
+            items = [{'or': items[:2]}] + items[2:]
+        structures[course] = items[0] if len(items) == 1 else {'and': items}
+    return structures
+
+
+def generate_listing_page(availability: Dict[str, List[str]], seed: int = 0) -> str:
+    """A course listing page for `availability`, in the PHP var_dump format the scraper parses"""
+    rng = random.Random(seed)
+
+    def string(value: str) -> str:
+        return f'string({len(value.encode())}) "{value}"'
+
+    objects = []
+    for k, (course, sessions) in enumerate(availability.items()):
+        department, number = course.rsplit(' ', 1)
+        fields = [
+            ('id', string(f'{department}{number}')),
+            ('department', string(department)),
+            ('number', string(number)),
+            ('title', string(f'Synthetic Course {k}')),
+            ('units', string(str(rng.choice([2, 4])))),
+            ('terms', string(', '.join(sessions))),
+            ('cores', 'array(0) {\n  }'),
+            ('description', string(' '.join(['Lorem ipsum dolor sit amet.'] * rng.randint(2, 12)))),
+        ]
+        body = ''.join(f'  ["{name}":protected]=>\n  {value}\n' for name, value in fields)
+        objects.append(f'object(Course)#{k + 1} ({len(fields)}) {{\n{body}}}\n')
+
+    return f'<pre>array({len(objects)}) {{\n' + ''.join(objects) + '}\n</pre>\n'
@@ -0,0 +1,224 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+from course_utils import (
+    find_prerequisites_file,
+    load_course_prerequisites,
+    create_prerequisites_dag,
+    create_forward_dag,
+    full_to_short_course_code,
+    prerequisite_clauses
+)
+from course_graph import DEFAULT_UNITS, ClosureIndex, CourseGraph, compile_course_graph, compile_prereq_rules
+from scraper import scape_read_csv
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_FILE_PATH = os.path.join(BACKEND_DIR, 'courses_availability.csv')
+AVAILABILITY_HISTORY_PATH = os.path.join(BACKEND_DIR, 'availability_history.npz')
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Read-only view of the course catalog shared by every request and planner"""
+    version: str
+    course_dict: Mapping[str, tuple]
+    availability: Mapping[str, Tuple[str, ...]]
+    prereq_dag: Mapping[str, Tuple[str, ...]]
+    forward_dag: Mapping[str, Tuple[str, ...]]
+    graph: CourseGraph
+    closure: ClosureIndex
+    prereq_rules: Tuple[Tuple[int, ...], ...]  # DNF clause bitmasks per graph id
+
+
+def _freeze_dag(dag: dict) -> Mapping[str, Tuple[str, ...]]:
+    return MappingProxyType({k: tuple(v) for k, v in dag.items()})
+
+
+def _file_digest(*paths: str) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def make_catalog_snapshot(availability: dict, prereqs_dag: dict, version: str = '',
+                          prereq_clauses: dict = None) -> CatalogSnapshot:
+    """Freeze already-parsed availability and prerequisite data into a snapshot"""
+    # Same shape CoursePlanner builds from the availability CSV: (title, prerequisites, units)
+    course_dict = {course: (course, (), DEFAULT_UNITS) for course in availability}
+    forward_dag = create_forward_dag(prereqs_dag)
+    graph = compile_course_graph(course_dict, prereqs_dag, forward_dag)
+
+    return CatalogSnapshot(
+        version=version,
+        course_dict=MappingProxyType(course_dict),
+        availability=_freeze_dag(availability),
+        prereq_dag=_freeze_dag(prereqs_dag),
+        forward_dag=_freeze_dag(forward_dag),
+        graph=graph,
+        closure=ClosureIndex(graph),
+        prereq_rules=compile_prereq_rules(graph, prereq_clauses),
+    )
+
+
+def build_catalog_snapshot(csv_path: str = CSV_FILE_PATH, prereqs_path: str = None) -> CatalogSnapshot:
+    """Parse the availability CSV and prerequisite JSON into an immutable snapshot"""
+    if prereqs_path is None:
+        prereqs_path = find_prerequisites_file()
+
+    prereqs_dict = load_course_prerequisites(prereqs_path)
+    return make_catalog_snapshot(
+        scape_read_csv(csv_path),
+        create_prerequisites_dag(prereqs_dict),
+        version=_file_digest(csv_path, prereqs_path),
+        prereq_clauses={
+            full_to_short_course_code(course): prerequisite_clauses(structure)
+            for course, structure in prereqs_dict.items()
+        },
+    )
+
+
+def load_catalog_snapshot(artifact_path: str = None, csv_path: str = CSV_FILE_PATH,
+                          prereqs_path: str = None) -> CatalogSnapshot:
+    """Load the catalog from its prebuilt binary artifact, else from the JSON/CSV sources.
+
+    The artifact is skipped when it is missing, fails verification, or was
+    built from sources other than the ones on disk.
+    """
+    from catalog_artifact import CATALOG_ARTIFACT_PATH, load_catalog_artifact, read_artifact_version
+
+    if artifact_path is None:
+        artifact_path = CATALOG_ARTIFACT_PATH
+    if prereqs_path is None:
+        prereqs_path = find_prerequisites_file()
+
+    if os.path.exists(artifact_path):
+        try:
+            # Sources may not be deployed next to the artifact; only compare when they are
+            if os.path.exists(csv_path) and os.path.exists(prereqs_path):
+                source_version = _file_digest(csv_path, prereqs_path)
+                if read_artifact_version(artifact_path) != source_version:
+                    raise ValueError(f"{artifact_path} is out of date with its sources")
+            return load_catalog_artifact(artifact_path)
+        except (OSError, ValueError) as e:
+            print(f"[Catalog] Falling back to JSON/CSV sources: {e}")
+
+    return build_catalog_snapshot(csv_path, prereqs_path)
+
+
+CATALOG_CHECK_INTERVAL = float(os.environ.get('CATALOG_CHECK_INTERVAL', 5))
+
+
+class CatalogManager:
+    """Owns the current catalog snapshot and swaps in a new one when its files change.
+
+    Readers call snapshot() and keep the object they get for the rest of their
+    request, so a swap never changes the catalog under an in-flight plan.
+    At most every `check_interval` seconds a read compares the mtime and size
+    of the source files (and the artifact) with the last load; on a change a
+    background thread rebuilds the snapshot and replaces the reference. A
+    rebuild whose content digest matches the current version is discarded.
+    """
+
+    def __init__(self, csv_path: str = CSV_FILE_PATH, prereqs_path: str = None,
+                 artifact_path: str = None, check_interval: float = CATALOG_CHECK_INTERVAL) -> None:
+        from catalog_artifact import CATALOG_ARTIFACT_PATH
+
+        self.csv_path = csv_path
+        self.prereqs_path = prereqs_path or find_prerequisites_file()
+        self.artifact_path = artifact_path or CATALOG_ARTIFACT_PATH
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._snapshot = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    def __source_signature(self) -> tuple:
+        signature = []
+        for path in (self.csv_path, self.prereqs_path, self.artifact_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def __load(self) -> Tuple[tuple, CatalogSnapshot]:
+        # Stat before reading, so a write landing mid-load is picked up by the next check
+        signature = self.__source_signature()
+        return signature, load_catalog_snapshot(self.artifact_path, self.csv_path, self.prereqs_path)
+
+    def __swap(self, signature: tuple, snapshot: CatalogSnapshot) -> None:
+        if self._snapshot is None or snapshot.version != self._snapshot.version:
+            if self._snapshot is not None:
+                self.reloads += 1
+                print(f"[Catalog] Swapped catalog {self._snapshot.version} for {snapshot.version}")
+            self._snapshot = snapshot
+        self._signature = signature
+
+    def __reload_in_background(self) -> None:
+        try:
+            signature, snapshot = self.__load()
+            with self._lock:
+                self.__swap(signature, snapshot)
+        except Exception as e:
+            # Keep serving the current snapshot; the next check retries
+            print(f"[Catalog] Reload failed, keeping catalog {self._snapshot.version}: {e}")
+        finally:
+            self._reloading = False
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot, loaded synchronously on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self.__swap(*self.__load())
+                    self._next_check = time.monotonic() + self.check_interval
+                return self._snapshot
+
+        now = time.monotonic()
+        if now >= self._next_check and not self._reloading:
+            with self._lock:
+                if now >= self._next_check and not self._reloading:
+                    self._next_check = now + self.check_interval
+                    if self.__source_signature() != self._signature:
+                        self._reloading = True
+                        threading.Thread(target=self.__reload_in_background, daemon=True).start()
+        return snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        """Rebuild from the files now and swap the result in before returning it"""
+        with self._lock:
+            self.__swap(*self.__load())
+            self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_catalog_manager() -> CatalogManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = CatalogManager()
+    return _manager
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """Return the process-wide catalog snapshot, building it on first use"""
+    return get_catalog_manager().snapshot()
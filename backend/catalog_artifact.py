@@ -0,0 +1,221 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from types import MappingProxyType
+from typing import List, Tuple
+
+from catalog import BACKEND_DIR, CatalogSnapshot, _freeze_dag
+from course_graph import DEFAULT_UNITS, ClosureIndex, CourseGraph
+
+
+CATALOG_ARTIFACT_PATH = os.path.join(BACKEND_DIR, 'catalog.bin')
+
+# Layout (little-endian): header, table of contents, then 8-byte aligned sections.
+# header: magic, format version, section count, source version (16 ascii bytes),
+#         sha256 of everything after the header
+ARTIFACT_MAGIC = b'ZGCATLG\0'
+ARTIFACT_FORMAT = 1
+_HEADER = struct.Struct('<8sII16s32s')
+_TOC_ENTRY = struct.Struct('<4sQQ')  # typecode (padded), byte offset, item count
+
+# Sections in file order, with their array typecodes:
+#   strings      utf-8 blob of every course code followed by every session name
+#   string_ends  end offset of each string in the blob
+#   units        units per course id
+#   prereq_*     CSR prerequisite edges (same layout as CourseGraph)
+#   forward_*    CSR forward edges
+#   prereq_keys  course ids of prereq_dag keys, in dict order
+#   forward_keys course ids of forward_dag keys, in dict order
+#   avail_*      CSR session string ids for course ids 0..n_available-1
+#   rule_*       clause ranges per course id, then member ids per clause
+_SECTIONS = (
+    ('strings', 'B'),
+    ('string_ends', 'I'),
+    ('units', 'H'),
+    ('prereq_offsets', 'I'),
+    ('prereq_targets', 'I'),
+    ('forward_offsets', 'I'),
+    ('forward_targets', 'I'),
+    ('prereq_keys', 'I'),
+    ('forward_keys', 'I'),
+    ('avail_offsets', 'I'),
+    ('avail_targets', 'I'),
+    ('rule_offsets', 'I'),
+    ('clause_offsets', 'I'),
+    ('clause_members', 'I'),
+)
+
+
+def _csr(rows) -> Tuple[array, array]:
+    offsets = array('I', [0])
+    targets = array('I')
+    for row in rows:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def _bits(mask: int) -> List[int]:
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def write_catalog_artifact(snapshot: CatalogSnapshot, path: str = CATALOG_ARTIFACT_PATH) -> str:
+    """Serialize a catalog snapshot into a binary artifact; returns its content hash"""
+    graph = snapshot.graph
+    codes = graph.codes
+    # Availability keys are interned first, so they are exactly ids 0..n_available-1
+    if tuple(snapshot.availability) != codes[:len(snapshot.availability)]:
+        raise ValueError("Availability courses must come first in the course graph")
+
+    sessions = list(dict.fromkeys(s for terms in snapshot.availability.values() for s in terms))
+    strings = list(codes) + sessions
+    session_ids = {s: len(codes) + k for k, s in enumerate(sessions)}
+
+    blob = bytearray()
+    string_ends = array('I')
+    for s in strings:
+        blob += s.encode('utf-8')
+        string_ends.append(len(blob))
+
+    avail_offsets, avail_targets = _csr([session_ids[s] for s in terms] for terms in snapshot.availability.values())
+    rule_offsets, clause_members = array('I', [0]), array('I')
+    clause_offsets = array('I', [0])
+    for clauses in snapshot.prereq_rules:
+        for clause in clauses:
+            clause_members.extend(_bits(clause))
+            clause_offsets.append(len(clause_members))
+        rule_offsets.append(len(clause_offsets) - 1)
+
+    sections = {
+        'strings': array('B', bytes(blob)),
+        'string_ends': string_ends,
+        'units': array('H', graph.units),
+        'prereq_offsets': array('I', graph.prereq_offsets),
+        'prereq_targets': array('I', graph.prereq_targets),
+        'forward_offsets': array('I', graph.forward_offsets),
+        'forward_targets': array('I', graph.forward_targets),
+        'prereq_keys': array('I', (graph.ids[c] for c in snapshot.prereq_dag)),
+        'forward_keys': array('I', (graph.ids[c] for c in snapshot.forward_dag)),
+        'avail_offsets': avail_offsets,
+        'avail_targets': avail_targets,
+        'rule_offsets': rule_offsets,
+        'clause_offsets': clause_offsets,
+        'clause_members': clause_members,
+    }
+
+    toc_size = _TOC_ENTRY.size * len(_SECTIONS)
+    offset = _HEADER.size + toc_size
+    toc, body = bytearray(), bytearray()
+    for name, typecode in _SECTIONS:
+        data = sections[name]
+        start = offset + len(body)
+        toc += _TOC_ENTRY.pack(typecode.encode(), start, len(data))
+        body += data.tobytes()
+        body += b'\0' * (-len(body) % 8)
+
+    payload = bytes(toc + body)
+    digest = hashlib.sha256(payload).digest()
+    header = _HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_FORMAT, len(_SECTIONS),
+                          snapshot.version.encode('ascii').ljust(16, b'\0')[:16], digest)
+
+    # Write beside the target and rename, so readers never see a partial file
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return digest.hex()
+
+
+def read_artifact_version(path: str = CATALOG_ARTIFACT_PATH) -> str:
+    """Source version recorded in an artifact's header, without mapping the sections"""
+    with open(path, 'rb') as f:
+        magic, fmt, _, version, _ = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != ARTIFACT_MAGIC or fmt != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} is not a version {ARTIFACT_FORMAT} catalog artifact")
+    return version.rstrip(b'\0').decode('ascii')
+
+
+def load_catalog_artifact(path: str = CATALOG_ARTIFACT_PATH) -> CatalogSnapshot:
+    """Map a catalog artifact into memory and rebuild the snapshot around it.
+
+    The edge and unit arrays of the course graph are memoryviews straight
+    into the mapping; only the strings, dict views and closure index are
+    built in Python. Raises ValueError when the file is not a valid artifact
+    or its content hash does not match.
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if sys.byteorder != 'little':
+        raise ValueError("Catalog artifacts are little-endian; build from sources on this platform")
+    view = memoryview(mm)
+    if len(view) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a catalog artifact")
+    magic, fmt, n_sections, version, digest = _HEADER.unpack(view[:_HEADER.size])
+    if magic != ARTIFACT_MAGIC or fmt != ARTIFACT_FORMAT or n_sections != len(_SECTIONS):
+        raise ValueError(f"{path} is not a version {ARTIFACT_FORMAT} catalog artifact")
+    if hashlib.sha256(view[_HEADER.size:]).digest() != digest:
+        raise ValueError(f"{path} failed its content hash check")
+
+    sections = {}
+    for k, (name, typecode) in enumerate(_SECTIONS):
+        entry_start = _HEADER.size + k * _TOC_ENTRY.size
+        code, start, count = _TOC_ENTRY.unpack(view[entry_start:entry_start + _TOC_ENTRY.size])
+        if code.rstrip(b'\0').decode() != typecode:
+            raise ValueError(f"{path} has an unexpected layout for section '{name}'")
+        size = count * struct.calcsize(typecode)
+        sections[name] = view[start:start + size].cast(typecode)
+
+    blob = bytes(sections['strings'])
+    strings, start = [], 0
+    for end in sections['string_ends']:
+        strings.append(blob[start:end].decode('utf-8'))
+        start = end
+
+    n = len(sections['units'])
+    codes = tuple(strings[:n])
+    graph = CourseGraph(
+        codes=codes,
+        ids=MappingProxyType({c: i for i, c in enumerate(codes)}),
+        units=sections['units'],
+        prereq_offsets=sections['prereq_offsets'],
+        prereq_targets=sections['prereq_targets'],
+        forward_offsets=sections['forward_offsets'],
+        forward_targets=sections['forward_targets'],
+    )
+
+    avail_offsets, avail_targets = sections['avail_offsets'], sections['avail_targets']
+    availability = {
+        codes[i]: [strings[s] for s in avail_targets[avail_offsets[i]:avail_offsets[i + 1]]]
+        for i in range(len(avail_offsets) - 1)
+    }
+    prereq_dag = {codes[i]: [codes[j] for j in graph.prereqs(i)] for i in sections['prereq_keys']}
+    forward_dag = {codes[i]: [codes[j] for j in graph.dependents(i)] for i in sections['forward_keys']}
+
+    rule_offsets, clause_offsets = sections['rule_offsets'], sections['clause_offsets']
+    members = sections['clause_members']
+    prereq_rules = tuple(
+        tuple(sum(1 << m for m in members[clause_offsets[c]:clause_offsets[c + 1]])
+              for c in range(rule_offsets[i], rule_offsets[i + 1]))
+        for i in range(n)
+    )
+
+    return CatalogSnapshot(
+        version=version.rstrip(b'\0').decode('ascii'),
+        course_dict=MappingProxyType({course: (course, (), DEFAULT_UNITS) for course in availability}),
+        availability=_freeze_dag(availability),
+        prereq_dag=_freeze_dag(prereq_dag),
+        forward_dag=_freeze_dag(forward_dag),
+        graph=graph,
+        closure=ClosureIndex(graph),
+        prereq_rules=prereq_rules,
+    )
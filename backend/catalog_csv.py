@@ -0,0 +1,55 @@
+import csv
+import os
+from typing import Dict, Iterator, List
+
+
+def iter_csv_rows(file_path: str) -> Iterator[Dict[str, str]]:
+    """Stream the rows of a CSV file as {column: value} dicts"""
+    with open(file_path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def _split(value: str) -> List[str]:
+    # Empty cells are missing values, i.e. no entries
+    return value.split('+') if value else []
+
+
+def read_availability_csv(file_path: str) -> Dict[str, List[str]]:
+    """Read a Course,Availability CSV into {course: [sessions]}"""
+    return {row['Course']: _split(row['Availability']) for row in iter_csv_rows(file_path)}
+
+
+def read_course_csv(file_path: str) -> Dict[str, tuple]:
+    """Read a course CSV into {course: (title, prerequisites, units)}.
+
+    Accepts the courses_availability.csv format (Course,Availability), which
+    has no titles, prerequisites or units, and the original
+    CoursesID,Title,Prerequisites,Units format.
+    """
+    with open(file_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        columns = reader.fieldnames or []
+
+        if 'Course' in columns and 'Availability' in columns:
+            # Course ID as title, no prerequisite info and 4 units per course
+            return {row['Course']: (row['Course'], [], 4) for row in reader}
+        elif 'CoursesID' in columns:
+            # Original format
+            return {
+                row['CoursesID']: (row['Title'], _split(row['Prerequisites']), int(row['Units']))
+                for row in reader
+            }
+        else:
+            raise ValueError("Unsupported CSV format. Expected columns not found.")
+
+
+def write_availability_csv(file_path: str, data: Dict[str, List[str]]) -> None:
+    """Write {course: [sessions]} as a Course,Availability CSV"""
+    # Write beside the target and rename, the catalog may reload from it at any moment
+    tmp_path = f'{file_path}.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Course', 'Availability'])
+        for course, sessions in data.items():
+            writer.writerow([course, '+'.join(sessions)])
+    os.replace(tmp_path, file_path)
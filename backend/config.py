@@ -30,5 +30,9 @@ class Config:
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'https://zotgraduator.vercel.app')
     CORS_ORIGINS = [FRONTEND_URL, "http://localhost:3000"]
     
+    # Build the course catalog in create_app. Serverless cold starts skip this so requests
+    # that don't plan (e.g. /api/health) never pay for it; the first planning request does
+    WARM_CATALOG_ON_STARTUP = not os.environ.get('VERCEL')
+    
     # API URL for frontend to use
     API_URL = os.environ.get('API_URL') or 'https://zotgraduator-backend.vercel.app/api'
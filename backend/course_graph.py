@@ -0,0 +1,302 @@
+from array import array
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+
+DEFAULT_UNITS = 4
+
+
+@dataclass(frozen=True)
+class CourseGraph:
+    """Course codes interned to dense integer ids with CSR prerequisite/forward edges.
+
+    The edges of course ``i`` are ``targets[offsets[i]:offsets[i + 1]]``.
+    """
+    codes: Tuple[str, ...]
+    ids: Mapping[str, int]
+    units: array
+    prereq_offsets: array
+    prereq_targets: array
+    forward_offsets: array
+    forward_targets: array
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.ids
+
+    def id_of(self, code: str, default: int = -1) -> int:
+        return self.ids.get(code, default)
+
+    def prereqs(self, i: int) -> array:
+        return self.prereq_targets[self.prereq_offsets[i]:self.prereq_offsets[i + 1]]
+
+    def dependents(self, i: int) -> array:
+        return self.forward_targets[self.forward_offsets[i]:self.forward_offsets[i + 1]]
+
+    def units_of(self, code: str) -> int:
+        i = self.ids.get(code)
+        return DEFAULT_UNITS if i is None else self.units[i]
+
+    def to_dag(self, forward: bool = False) -> Dict[str, List[str]]:
+        edges = self.dependents if forward else self.prereqs
+        return {c: [self.codes[j] for j in edges(i)] for i, c in enumerate(self.codes)}
+
+
+def _build_csr(n: int, adjacency: Iterable[Tuple[int, Iterable[int]]]) -> Tuple[array, array]:
+    rows = [[] for _ in range(n)]
+    for i, targets in adjacency:
+        rows[i].extend(targets)
+
+    offsets = array('I', [0])
+    targets = array('I')
+    for row in rows:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def compile_course_graph(course_dict: Mapping[str, tuple],
+                         prereq_dag: Mapping[str, Iterable[str]],
+                         forward_dag: Mapping[str, Iterable[str]] = None) -> CourseGraph:
+    """Intern every course code in the catalog and DAGs and pack the edges into flat arrays"""
+    ids = {}
+
+    def intern(code: str) -> int:
+        i = ids.get(code)
+        if i is None:
+            i = ids[code] = len(ids)
+        return i
+
+    for code in course_dict:
+        intern(code)
+    prereq_edges = [(intern(c), [intern(p) for p in prereqs]) for c, prereqs in prereq_dag.items()]
+    if forward_dag is not None:
+        forward_edges = [(intern(c), [intern(d) for d in deps]) for c, deps in forward_dag.items()]
+    else:
+        forward_edges = [(p, [c]) for c, prereqs in prereq_edges for p in prereqs]
+
+    n = len(ids)
+    codes = tuple(ids)
+    units = array('H', (int(course_dict[c][2]) if c in course_dict else DEFAULT_UNITS for c in codes))
+    prereq_offsets, prereq_targets = _build_csr(n, prereq_edges)
+    forward_offsets, forward_targets = _build_csr(n, forward_edges)
+
+    return CourseGraph(
+        codes=codes,
+        ids=MappingProxyType(ids),
+        units=units,
+        prereq_offsets=prereq_offsets,
+        prereq_targets=prereq_targets,
+        forward_offsets=forward_offsets,
+        forward_targets=forward_targets,
+    )
+
+
+def find_cycles(graph: CourseGraph, nodes: Iterable[int] = None) -> List[List[int]]:
+    """Strongly connected components with a cycle, over `nodes` (default: every course).
+
+    Iterative Tarjan along prerequisite edges, so deep chains cannot hit the
+    recursion limit.
+    """
+    n = len(graph)
+    if nodes is None:
+        nodes = range(n)
+    member = bytearray(n)
+    for i in nodes:
+        member[i] = 1
+
+    index = array('i', [-1]) * n
+    lowlink = array('i', [0]) * n
+    on_stack = bytearray(n)
+    stack = []
+    cycles = []
+    counter = 0
+
+    for root in range(n):
+        if not member[root] or index[root] >= 0:
+            continue
+        work = [(root, iter(graph.prereqs(root)))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+
+        while work:
+            v, edges = work[-1]
+            for w in edges:
+                if not member[w]:
+                    continue
+                if index[w] < 0:
+                    index[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append((w, iter(graph.prereqs(w))))
+                    break
+                if on_stack[w]:
+                    lowlink[v] = min(lowlink[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
+                if lowlink[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        component.append(w)
+                        if w == v:
+                            break
+                    if len(component) > 1 or v in graph.prereqs(v):
+                        cycles.append(component[::-1])
+
+    return cycles
+
+
+class GraphOrder(NamedTuple):
+    order: List[int]          # Course ids, every course after all of its prerequisites
+    levels: array             # Longest prerequisite chain below each course (-1 if not ordered)
+    cycles: List[List[int]]   # Prerequisite cycles; they and every course behind them are unordered
+
+
+def order_course_graph(graph: CourseGraph) -> GraphOrder:
+    """Topological order, depth levels and cycles of a CourseGraph in O(V + E).
+
+    Kahn's algorithm over prerequisite edges; a course's level is one more
+    than its deepest prerequisite, so courses without prerequisites are level
+    0. Courses left in the queue are on or behind a cycle, and only those are
+    searched for cycles.
+    """
+    n = len(graph)
+    indegree = array('i', (graph.prereq_offsets[i + 1] - graph.prereq_offsets[i] for i in range(n)))
+    levels = array('i', [-1]) * n
+    order = [i for i in range(n) if indegree[i] == 0]
+    for i in order:
+        levels[i] = 0
+    for i in order:
+        for d in graph.dependents(i):
+            levels[d] = max(levels[d], levels[i] + 1)
+            indegree[d] -= 1
+            if indegree[d] == 0:
+                order.append(d)
+
+    cycles = []
+    if len(order) < n:
+        unordered = [i for i in range(n) if indegree[i] > 0]
+        for i in unordered:
+            levels[i] = -1
+        cycles = find_cycles(graph, unordered)
+    return GraphOrder(order, levels, cycles)
+
+
+class ClosureIndex:
+    """Transitive prerequisite closure of a CourseGraph as Python-int bitsets.
+
+    Bit ``j`` of ``ancestor_masks[i]`` is set when course ``j`` is a direct or
+    indirect prerequisite of course ``i``; ``descendant_masks`` is the reverse.
+    ``rank[i]`` is the course's position in a topological order (courses on or
+    behind a cycle share the last rank); ``order``, ``levels`` and ``cycles``
+    are the shared GraphOrder.
+    """
+
+    def __init__(self, graph: CourseGraph) -> None:
+        self.graph = graph
+        n = len(graph)
+
+        # Kahn order over prerequisite edges: every course after all of its prerequisites
+        graph_order = order_course_graph(graph)
+        order = graph_order.order
+
+        rank = array('i', [len(order)]) * n
+        for position, i in enumerate(order):
+            rank[i] = position
+
+        ancestors = [0] * n
+        for i in order:
+            mask = 0
+            for p in graph.prereqs(i):
+                mask |= ancestors[p] | 1 << p
+            ancestors[i] = mask
+
+        # Courses on or behind a cycle never leave the queue; close them with a plain walk
+        if len(order) < n:
+            released = bytearray(n)
+            for i in order:
+                released[i] = 1
+            for i in range(n):
+                if not released[i]:
+                    ancestors[i] = self.__walk(i, graph.prereqs)
+
+        descendants = [0] * n
+        for i in range(n):
+            bit = 1 << i
+            mask = ancestors[i]
+            while mask:
+                low = mask & -mask
+                descendants[low.bit_length() - 1] |= bit
+                mask ^= low
+
+        self.order = order
+        self.rank = rank
+        self.levels = graph_order.levels
+        self.cycles = graph_order.cycles
+        self.ancestor_masks = ancestors
+        self.descendant_masks = descendants
+
+    @staticmethod
+    def __walk(start: int, edges) -> int:
+        mask = 0
+        stack = list(edges(start))
+        while stack:
+            i = stack.pop()
+            if not mask >> i & 1:
+                mask |= 1 << i
+                stack.extend(edges(i))
+        return mask
+
+    def __codes(self, mask: int) -> List[str]:
+        codes = []
+        while mask:
+            low = mask & -mask
+            codes.append(self.graph.codes[low.bit_length() - 1])
+            mask ^= low
+        return codes
+
+    def is_prereq(self, a: str, b: str) -> bool:
+        """True when course `a` must be taken (directly or indirectly) before course `b`"""
+        ia, ib = self.graph.id_of(a), self.graph.id_of(b)
+        return ia >= 0 and ib >= 0 and bool(self.ancestor_masks[ib] >> ia & 1)
+
+    def ancestors(self, course: str) -> List[str]:
+        i = self.graph.id_of(course)
+        return self.__codes(self.ancestor_masks[i]) if i >= 0 else []
+
+    def descendants(self, course: str) -> List[str]:
+        i = self.graph.id_of(course)
+        return self.__codes(self.descendant_masks[i]) if i >= 0 else []
+
+
+def compile_prereq_rules(graph: CourseGraph,
+                         clauses_by_course: Mapping[str, Iterable[Iterable[str]]] = None) -> Tuple[Tuple[int, ...], ...]:
+    """Prerequisite rule of every course as DNF clauses over course-id bitmasks.
+
+    A course is eligible once any one of its clauses is a subset of the
+    finished-course mask; an empty tuple means it has no prerequisites.
+    Courses without logical clauses need all of their prerequisite edges.
+    """
+    clauses_by_course = clauses_by_course or {}
+    rules = []
+    for i, code in enumerate(graph.codes):
+        if code in clauses_by_course:
+            clauses = tuple(sum(1 << graph.ids[c] for c in clause if c in graph.ids)
+                            for clause in clauses_by_course[code])
+        else:
+            prereqs = graph.prereqs(i)
+            clauses = (sum(1 << p for p in set(prereqs)),) if len(prereqs) else ()
+        # A clause that is already empty makes the course always eligible
+        rules.append(() if 0 in clauses else clauses)
+    return tuple(rules)
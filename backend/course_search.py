@@ -0,0 +1,273 @@
+import os
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from course_utils import full_to_short_course_code, short_to_full_course_code
+
+
+SEARCH_INDEX_MAX_AGE = float(os.environ.get('SEARCH_INDEX_MAX_AGE', 300))
+SEARCH_LIMIT = 50
+SUGGESTION_LIMIT = 20
+
+# A word found in a course's code counts for more than one in its title,
+# which counts for more than one only mentioned in its description
+CODE_WEIGHT = 4.0
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Trigram (Dice) similarity a word needs to stand in for a misspelled query word
+FUZZY_THRESHOLD = 0.5
+MAX_PREFIX_WORDS = 256
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+_index = None
+_index_lock = threading.Lock()
+_code_index = None
+_code_index_lock = threading.Lock()
+
+
+def search_words(text: str) -> List[str]:
+    """Lowercased alphanumeric words of `text`; 'I&C SCI' reads as 'ic sci'"""
+    return _WORD.findall(text.lower().replace('&', '')) if text else []
+
+
+def code_words(class_name: str) -> Set[str]:
+    """Words a course code is searched by: both department spellings, the number,
+    and each department run together with the number ('COMPSCI 161' gives
+    compsci, cs, 161, compsci161 and cs161)"""
+    words = set()
+    for code in {class_name, full_to_short_course_code(class_name)}:
+        parts = search_words(code)
+        words.update(parts)
+        if len(parts) > 1:
+            words.add(''.join(parts))
+    return words
+
+
+def code_key(code: str) -> str:
+    """A course code as typed, reduced to lowercase letters and digits ('CS 161' -> 'cs161')"""
+    return ''.join(search_words(code))
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CourseSearchIndex:
+    """Inverted index over course codes, titles and descriptions.
+
+    Every distinct word points at the courses it appears in, with the weight
+    of the best field it appears in; every trigram of a word points back at
+    the words containing it. A query word matches indexed words exactly, by
+    prefix (a sorted vocabulary searched with bisect) or by trigram overlap,
+    and a course scores the sum over query words of its best match times that
+    field weight. Courses are added, replaced and removed one at a time.
+    """
+
+    def __init__(self, courses: Iterable[dict] = ()) -> None:
+        self.built_at = time.monotonic()
+        self.documents: Dict[int, dict] = {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.word_trigrams: Dict[str, Set[str]] = {}
+        self.trigram_words: Dict[str, Set[str]] = defaultdict(set)
+        self.vocabulary: List[str] = []    # Sorted, for prefix lookups
+        self._doc_words: Dict[int, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+        words = []
+        for course in courses:
+            words.extend(self.__index(course))
+        self.vocabulary = sorted(set(words))
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def __fields(course: dict) -> Dict[str, float]:
+        weights = {}
+        for words, weight in ((search_words(course.get('description') or ''), DESCRIPTION_WEIGHT),
+                              (search_words(course.get('title') or ''), TITLE_WEIGHT),
+                              (code_words(course['class_name']), CODE_WEIGHT)):
+            for word in words:
+                weights[word] = weight
+        return weights
+
+    def __index(self, course: dict) -> List[str]:
+        # Returns the words new to the vocabulary; callers keep it sorted
+        doc_id = course['id']
+        weights = self.__fields(course)
+        self.documents[doc_id] = course
+        self._doc_words[doc_id] = tuple(weights)
+
+        new_words = []
+        for word, weight in weights.items():
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = {}
+                self.word_trigrams[word] = grams = trigrams(word)
+                for gram in grams:
+                    self.trigram_words[gram].add(word)
+                new_words.append(word)
+            posting[doc_id] = weight
+        return new_words
+
+    def __unindex(self, doc_id: int) -> None:
+        self.documents.pop(doc_id, None)
+        for word in self._doc_words.pop(doc_id, ()):
+            posting = self.postings[word]
+            del posting[doc_id]
+            if posting:
+                continue
+            del self.postings[word]
+            for gram in self.word_trigrams.pop(word):
+                self.trigram_words[gram].discard(word)
+                if not self.trigram_words[gram]:
+                    del self.trigram_words[gram]
+            del self.vocabulary[bisect_left(self.vocabulary, word)]
+
+    def put(self, course: dict) -> None:
+        """Add `course` (a Course.to_dict()), replacing any course with its id"""
+        with self._lock:
+            self.__unindex(course['id'])
+            for word in self.__index(course):
+                self.vocabulary.insert(bisect_left(self.vocabulary, word), word)
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self.__unindex(doc_id)
+
+    def __matches(self, token: str) -> Dict[str, float]:
+        # {indexed word: how well it matches `token`, in (0, 1]}
+        matches = {}
+        start = bisect_left(self.vocabulary, token)
+        for word in self.vocabulary[start:start + MAX_PREFIX_WORDS]:
+            if not word.startswith(token):
+                break
+            # An exact word is 1, a prefix of it a little less the more is left to type
+            matches[word] = 0.5 + 0.5 * len(token) / len(word)
+
+        # Only look for misspellings of words the catalog doesn't have
+        if len(token) >= 3 and token not in self.postings:
+            grams = trigrams(token)
+            shared = defaultdict(int)
+            for gram in grams:
+                for word in self.trigram_words.get(gram, ()):
+                    shared[word] += 1
+            for word, count in shared.items():
+                dice = 2 * count / (len(grams) + len(self.word_trigrams[word]))
+                if dice >= FUZZY_THRESHOLD and dice > matches.get(word, 0):
+                    matches[word] = dice
+        return matches
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[dict]:
+        """Courses best matching `query`, best first (ties in code order)"""
+        tokens = list(dict.fromkeys(search_words(query)))
+        scores = defaultdict(float)
+        with self._lock:
+            for token in tokens:
+                best = {}
+                for word, similarity in self.__matches(token).items():
+                    for doc_id, weight in self.postings[word].items():
+                        score = similarity * weight
+                        if score > best.get(doc_id, 0):
+                            best[doc_id] = score
+                for doc_id, score in best.items():
+                    scores[doc_id] += score
+
+            ranked = heapq.nsmallest(limit, scores, key=lambda d: (-scores[d], self.documents[d]['class_name']))
+            return [self.documents[doc_id] for doc_id in ranked]
+
+
+def build_course_search_index() -> CourseSearchIndex:
+    """Index every course in the database"""
+    from models.course import Course
+
+    start = time.perf_counter()
+    index = CourseSearchIndex(course.to_dict() for course in Course.query.all())
+    print(f"[Search] Indexed {len(index)} courses in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return index
+
+
+def get_course_search_index() -> CourseSearchIndex:
+    """The process-wide index, built on first use and rebuilt after SEARCH_INDEX_MAX_AGE
+    seconds so edits made through other worker processes show up too"""
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.built_at > SEARCH_INDEX_MAX_AGE:
+        with _index_lock:
+            if _index is index:
+                _index = build_course_search_index()
+            index = _index
+    return index
+
+
+def index_course(course: dict) -> None:
+    """Apply a created or updated course to the index, if one has been built"""
+    index = _index
+    if index is not None:
+        index.put(course)
+
+
+def unindex_course(course_id: int) -> None:
+    index = _index
+    if index is not None:
+        index.remove(course_id)
+
+
+class CourseCodeIndex:
+    """Course codes for autocomplete: a sorted array of (code_key, course) pairs
+    covering each course's short and full department spelling, searched by
+    prefix with bisect. Built once per catalog version."""
+
+    def __init__(self, courses: Iterable[str], version: str = '') -> None:
+        self.version = version
+        self.courses = list(courses)
+        entries = sorted({
+            (code_key(alias), course)
+            for course in self.courses
+            for alias in (course, short_to_full_course_code(course), full_to_short_course_code(course))
+        })
+        self.keys = [key for key, _ in entries]
+        self.codes = [course for _, course in entries]
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Courses with a code starting with `prefix`, closest (shortest) codes first;
+        every course, in catalog order, for an empty prefix"""
+        key = code_key(prefix)
+        if not key:
+            return self.courses[:limit]
+
+        # Keys are only [a-z0-9], so every key starting with `key` sorts before key + '\x7f'
+        lo = bisect_left(self.keys, key)
+        hi = bisect_left(self.keys, key + '\x7f', lo)
+        best = {}
+        for i in range(lo, hi):
+            course = self.codes[i]
+            rank = (len(self.keys[i]), self.keys[i])
+            if course not in best or rank < best[course]:
+                best[course] = rank
+        if limit is None:
+            return sorted(best, key=best.get)
+        return heapq.nsmallest(limit, best, key=best.get)
+
+
+def get_course_code_index() -> CourseCodeIndex:
+    """Code index for the current catalog snapshot, rebuilt when the catalog is swapped"""
+    global _code_index
+    from catalog import get_catalog_snapshot
+
+    snapshot = get_catalog_snapshot()
+    index = _code_index
+    if index is None or index.version != snapshot.version:
+        with _code_index_lock:
+            if _code_index is index:
+                _code_index = CourseCodeIndex(snapshot.availability, snapshot.version)
+            index = _code_index
+    return index
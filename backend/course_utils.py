@@ -1,6 +1,5 @@
 import json
 import os
-import pandas as pd
 
 # Define mappings between shorthand and full course codes
 COURSE_CODE_MAPPINGS = {
@@ -18,8 +17,8 @@ COURSE_CODE_MAPPINGS = {
 # Reverse mappings for converting from full names to shorthand
 REVERSE_MAPPINGS = {v: k for k, v in COURSE_CODE_MAPPINGS.items()}
 
-def load_course_prerequisites():
-    """Load course prerequisites from JSON file"""
+def find_prerequisites_file():
+    """Locate the course prerequisites JSON file"""
     # Get the path to the JSON file
     current_dir = os.path.dirname(os.path.abspath(__file__))
     json_path = os.path.join(current_dir, '../frontend/src/data/course_data_with_logical_prereqs.json')
@@ -28,6 +27,13 @@ def load_course_prerequisites():
     if not os.path.exists(json_path):
         json_path = os.path.join(current_dir, '../data/course_data_with_logical_prereqs.json')
     
+    return json_path
+
+def load_course_prerequisites(json_path=None):
+    """Load course prerequisites from JSON file"""
+    if json_path is None:
+        json_path = find_prerequisites_file()
+    
     # Check if file exists, return empty dict if not
     if not os.path.exists(json_path):
         print(f"Warning: Could not find prerequisites file at {json_path}")
@@ -82,8 +88,34 @@ def extract_direct_prerequisites(prereq_structure):
     
     return prereqs
 
+def prerequisite_clauses(prereq_structure, limit=64):
+    """Expand a logical structure into OR-of-AND clauses (DNF) of short course codes"""
+    if isinstance(prereq_structure, str):
+        return [frozenset([full_to_short_course_code(prereq_structure)])]
+    
+    if isinstance(prereq_structure, dict) and 'and' in prereq_structure:
+        clauses = [frozenset()]
+        for item in prereq_structure['and']:
+            clauses = [a | b for a in clauses for b in prerequisite_clauses(item, limit)]
+    elif isinstance(prereq_structure, dict) and 'or' in prereq_structure:
+        clauses = []
+        for item in prereq_structure['or']:
+            clauses.extend(prerequisite_clauses(item, limit))
+    else:
+        return [frozenset()]
+    
+    # Drop clauses that contain another clause, they can never be the cheaper option
+    clauses = sorted(set(clauses), key=lambda clause: (len(clause), sorted(clause)))
+    minimal = []
+    for clause in clauses:
+        if not any(kept <= clause for kept in minimal):
+            minimal.append(clause)
+    
+    # Past the limit, keep the smallest clauses: a course may look blocked, never wrongly eligible
+    return minimal[:limit]
+
 def get_all_prerequisites(course_id, prereqs_dict):
-    """Get all prerequisites for a course including nested ones"""
+    """Get the direct prerequisites for a course (transitive ones are in catalog.closure)"""
     if course_id not in prereqs_dict:
         return []
     
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+LISTING_CACHE_DIR = os.environ.get(
+    'LISTING_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'listing_cache')
+)
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class CachedListing(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: str
+    courses: Dict[str, List[str]]
+
+
+class ListingCache:
+    """Raw listing pages on disk, with their validators, content hash and parsed courses.
+
+    Each query is stored as <key>.html (the body as received) and <key>.json
+    (everything else), both written beside their target and renamed into
+    place. Queries are fetched by one thread at a time, so entries need no
+    locking; only the counters are shared.
+    """
+
+    def __init__(self, directory: str = LISTING_CACHE_DIR) -> None:
+        self.directory = directory
+        self.not_modified = 0   # 304, nothing downloaded
+        self.unchanged = 0      # Downloaded again, but the same bytes
+        self.changed = 0        # New or different page, parsed
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __path(self, query: str, ext: str) -> str:
+        key = hashlib.sha256(query.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f'{key}.{ext}')
+
+    def get(self, query: str) -> Optional[CachedListing]:
+        try:
+            with open(self.__path(query, 'json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('query') != query or not os.path.exists(self.__path(query, 'html')):
+            return None
+        return CachedListing(meta['etag'], meta['lastModified'], meta['sha256'], meta['courses'])
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedListing]) -> dict:
+        """If-None-Match / If-Modified-Since for revalidating `entry`"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def spool(self, query: str, chunks: Iterable[bytes]) -> Tuple[str, str]:
+        """Write a downloaded body next to its entry; returns (temporary path, sha256)"""
+        tmp_path = f"{self.__path(query, 'html')}.tmp"
+        digest = hashlib.sha256()
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+        return tmp_path, digest.hexdigest()
+
+    @staticmethod
+    def read_spooled(path: str) -> Iterator[bytes]:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def put(self, query: str, entry: CachedListing, spooled_path: Optional[str] = None) -> None:
+        """Store `entry`, replacing the cached page with `spooled_path` if given"""
+        if spooled_path is not None:
+            os.replace(spooled_path, self.__path(query, 'html'))
+        meta_path = self.__path(query, 'json')
+        with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump({
+                'query': query,
+                'etag': entry.etag,
+                'lastModified': entry.last_modified,
+                'sha256': entry.sha256,
+                'courses': entry.courses,
+            }, f, separators=(',', ':'))
+        os.replace(f'{meta_path}.tmp', meta_path)
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "notModified": self.not_modified,
+                "unchanged": self.unchanged,
+                "changed": self.changed,
+            }
@@ -0,0 +1,235 @@
+import time
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence
+
+from course_graph import CourseGraph
+from course_utils import REVERSE_MAPPINGS, short_to_full_course_code
+
+
+class OptimizedPlan(NamedTuple):
+    terms: List[List[str]]      # Courses per term, in term order
+    optimal: bool               # False when the node budget or deadline cut the search short
+    nodes: int                  # Search nodes expanded
+    unschedulable: List[str]    # Required courses that can never be placed
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def short_code(code: str) -> str:
+    """Short form of a course code, departments of several words included ('I&C SCI 46' -> 'ICS 46')"""
+    if ' ' not in code:
+        return code
+    department, number = code.rsplit(' ', 1)
+    return f"{REVERSE_MAPPINGS.get(department, department)} {number}"
+
+
+def rule_clauses(graph: CourseGraph, prereq_rules: Sequence[Sequence[int]],
+                 courses: Iterable[str]) -> Dict[str, List[List[str]]]:
+    """Compiled DNF rules (CatalogSnapshot.prereq_rules) of `courses` as clauses of
+    course codes, in the short form availability uses ('I&C SCI 46' -> 'ICS 46')"""
+    clauses = {}
+    for course in courses:
+        # The prerequisite data lists some courses under their full code only
+        ids = [i for i in dict.fromkeys(graph.id_of(code) for code in (course, short_to_full_course_code(course)))
+               if i >= 0]
+        if ids:
+            i = next((i for i in ids if prereq_rules[i]), ids[0])
+            clauses[course] = [[short_code(graph.codes[p]) for p in _bits(mask)] for mask in prereq_rules[i]]
+    return clauses
+
+
+def solve_min_terms(required: Sequence[str],
+                    availability: Mapping[str, Sequence[str]],
+                    prereq_dag: Mapping[str, Sequence[str]],
+                    max_units: int,
+                    sessions: Sequence[str],
+                    completed: Iterable[str] = (),
+                    units: Mapping[str, int] = None,
+                    default_units: int = 4,
+                    node_budget: int = 200_000,
+                    time_budget: float = 2.0,
+                    prereq_clauses: Mapping[str, Sequence[Sequence[str]]] = None) -> OptimizedPlan:
+    """Find a plan for `required` that uses the fewest terms.
+
+    Branch-and-bound over bitset-encoded sets of finished courses. Each term
+    takes a maximal set of eligible courses that fits in `max_units` (taking an
+    eligible course earlier never makes a plan longer), and a branch is cut
+    when its terms so far plus a lower bound reach the best plan found. The
+    bound is the larger of the longest remaining prerequisite chain, walked
+    through the sessions each course is offered in, and the remaining units
+    over the per-term capacity. When `node_budget` nodes have been expanded or
+    `time_budget` seconds have passed, the best plan so far is returned with
+    optimal=False.
+
+    A course's prerequisites are all of its prereq_dag edges, or any one of its
+    `prereq_clauses` (DNF, as in course_graph.compile_prereq_rules) when it has
+    them. As in CoursePlanner, a clause is only met by courses that are
+    completed or planned here: one naming a course that is neither can never
+    be met. A course with no clause left that can be met is unschedulable, and
+    so is every course whose every clause needs an unschedulable course.
+    """
+    deadline = time.perf_counter() + time_budget
+    completed = set(completed)
+    prereq_clauses = prereq_clauses or {}
+    units = units or {}
+    n_sessions = len(sessions)
+
+    # Courses that can ever be placed: offered in a planned session and within capacity
+    pending = [course for course in dict.fromkeys(required) if course not in completed]
+    unschedulable = []
+    placeable = []
+    for course in pending:
+        offered = set(availability.get(course, ())) & set(sessions)
+        if not offered or units.get(course, default_units) > max_units:
+            unschedulable.append(course)
+        else:
+            placeable.append(course)
+
+    # Clauses over the pending courses: [] when there is nothing left to take
+    # first, None when no clause can be met from completed and required courses
+    pending_set = set(pending)
+
+    def rule_of(course: str) -> Optional[List[List[str]]]:
+        clauses = prereq_clauses[course] if course in prereq_clauses else [prereq_dag.get(course, ())]
+        if not clauses:
+            return []
+        clauses = [[p for p in dict.fromkeys(clause) if p not in completed] for clause in clauses
+                   if all(p in completed or p in pending_set for p in clause)]
+        if not clauses:
+            return None
+        return [] if any(not clause for clause in clauses) else clauses
+
+    rules = {}
+    for course in list(placeable):
+        rules[course] = rule_of(course)
+        if rules[course] is None:
+            placeable.remove(course)
+            unschedulable.append(course)
+
+    # Release courses once one of their clauses is fully released, giving a
+    # topological order; courses never released (behind an unschedulable
+    # course in every clause, or on a cycle) are unschedulable
+    order = []
+    released = set()
+    remaining = list(placeable)
+    while True:
+        ready = [c for c in remaining if not rules[c] or any(set(clause) <= released for clause in rules[c])]
+        if not ready:
+            break
+        order.extend(ready)
+        released.update(ready)
+        remaining = [c for c in remaining if c not in released]
+    unschedulable.extend(remaining)
+
+    codes = order
+    ids = {c: i for i, c in enumerate(codes)}
+    # Clauses naming an unschedulable course can never be met and are dropped
+    clause_ids = [[[ids[p] for p in clause] for clause in rules[c] if set(clause) <= released] for c in codes]
+
+    n = len(codes)
+    full = (1 << n) - 1
+    course_units = [units.get(c, default_units) for c in codes]
+    clause_masks = [[sum(1 << p for p in clause) for clause in clauses] for clauses in clause_ids]
+    offered_mask = [sum(1 << i for i, c in enumerate(codes) if s in availability.get(c, ()))
+                    for s in sessions]
+    offered_in = [[s_idx for s_idx, s in enumerate(sessions) if s in availability.get(c, ())] for c in codes]
+
+    # Longest chain of dependents below each course, to try critical courses first
+    height = [0] * n
+    for i in reversed(range(n)):
+        for clause in clause_ids[i]:
+            for p in clause:
+                if p < i:
+                    height[p] = max(height[p], height[i] + 1)
+    by_priority = sorted(range(n), key=lambda i: (-height[i], codes[i]))
+
+    def lower_bound(done: int, term: int) -> int:
+        remaining = full & ~done
+        if not remaining:
+            return 0
+        total = sum(course_units[i] for i in _bits(remaining))
+        bound = -(-total // max_units)
+
+        # Earliest term each remaining course could finish, following availability
+        earliest = {}
+        for i in range(n):
+            if not remaining >> i & 1:
+                continue
+            # Cheapest clause; members not seen yet only make the bound looser
+            start = min((max([earliest[p] + 1 for p in clause if p in earliest], default=term)
+                         for clause in clause_ids[i]), default=term)
+            earliest[i] = min(start + (s - start) % n_sessions for s in offered_in[i])
+            bound = max(bound, earliest[i] + 1 - term)
+        return bound
+
+    def maximal_loads(eligible: List[int]) -> Iterator[int]:
+        # Subsets of `eligible` within capacity that no other eligible course fits into,
+        # highest-priority courses included first
+        suffix_units = [0] * (len(eligible) + 1)
+        for idx in reversed(range(len(eligible))):
+            suffix_units[idx] = suffix_units[idx + 1] + course_units[eligible[idx]]
+
+        def extend(idx: int, chosen: int, used: int, smallest_skipped: int) -> Iterator[int]:
+            # Give up once the load can no longer grow past the room a skipped course needs
+            if used + suffix_units[idx] <= max_units - smallest_skipped:
+                return
+            if idx == len(eligible):
+                yield chosen
+                return
+            i = eligible[idx]
+            if used + course_units[i] <= max_units:
+                yield from extend(idx + 1, chosen | 1 << i, used + course_units[i], smallest_skipped)
+            yield from extend(idx + 1, chosen, used, min(smallest_skipped, course_units[i]))
+
+        return extend(0, 0, 0, max_units + 1)
+
+    def eligible_at(done: int, term: int) -> List[int]:
+        candidates = offered_mask[term % n_sessions] & ~done
+        return [i for i in by_priority if candidates >> i & 1
+                and (not clause_masks[i] or any(mask & ~done == 0 for mask in clause_masks[i]))]
+
+    # Greedy plan (first maximal load each term) as the initial incumbent
+    best, done = [], 0
+    while done != full:
+        best.append(next(maximal_loads(eligible_at(done, len(best)))))
+        done |= best[-1]
+
+    nodes = 0
+    exhausted = False
+    seen = {}
+    path = []
+
+    def search(done: int, term: int) -> None:
+        nonlocal best, nodes, exhausted
+        if done == full:
+            if term < len(best):
+                best = list(path)
+            return
+        if term + lower_bound(done, term) >= len(best):
+            return
+        # Same finished set at the same point in the session cycle, reached no later before
+        key = (done, term % n_sessions)
+        if seen.get(key, term + 1) <= term:
+            return
+        seen[key] = term
+
+        for load in maximal_loads(eligible_at(done, term)):
+            nodes += 1
+            if nodes > node_budget or time.perf_counter() > deadline:
+                exhausted = True
+                return
+
+            path.append(load)
+            search(done | load, term + 1)
+            path.pop()
+            if exhausted:
+                return
+
+    search(0, 0)
+
+    terms = [[codes[i] for i in by_priority if load >> i & 1] for load in best]
+    return OptimizedPlan(terms=terms, optimal=not exhausted, nodes=nodes, unschedulable=unschedulable)
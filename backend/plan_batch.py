@@ -0,0 +1,116 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from numbers import Real
+from typing import Iterator, List, Optional, Tuple
+
+from catalog import get_catalog_snapshot
+from plan_generation import InfeasiblePlanError, generate_plan_cached
+
+
+MAX_BATCH_SIZE = 1000
+
+# (type, min, max) of the numeric request fields generate_plan reads
+NUMERIC_FIELDS = {
+    'plannedYears': (int, 1, 10),
+    'maxUnitsPerSemester': (int, 1, 40),
+    'startYear': (int, 1900, 2200),
+    'numPlans': (int, 1, 20),
+    'timeBudgetMs': (Real, 0, 60_000),
+    'offeringThreshold': (Real, 0, 1),
+}
+LIST_FIELDS = ('completedCourses', 'electiveCourses', 'sessions')
+BATCH_WORKERS = int(os.environ.get('PLANNER_BATCH_WORKERS', 0)) or os.cpu_count() or 1
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    # Build the catalog once per worker, before its first plan
+    get_catalog_snapshot()
+
+
+def _plan_one(index: int, data: dict) -> Tuple[int, dict]:
+    try:
+        return index, generate_plan_cached(data)
+    except InfeasiblePlanError as e:
+        return index, {"success": False, "error": str(e), "unschedulable": e.unschedulable}
+    except ValueError as e:
+        return index, {"success": False, "error": str(e)}
+    except Exception as e:
+        # Anything else is still this entry's failure, not the batch's
+        print(f"[Plan Batch] Request {index} failed: {e!r}")
+        return index, {"success": False, "error": f"Failed to generate plan: {e}"}
+
+
+def validate_plan_request(data) -> Optional[str]:
+    """Why a batch entry can't be planned, or None if it can be sent to a worker"""
+    if not isinstance(data, dict):
+        return "Each planning request must be a JSON object"
+    for name, (kind, low, high) in NUMERIC_FIELDS.items():
+        if name not in data:
+            continue
+        value = data[name]
+        if isinstance(value, bool) or not isinstance(value, kind):
+            return f"{name} must be {'an integer' if kind is int else 'a number'}"
+        if not low <= value <= high:
+            return f"{name} must be between {low} and {high}"
+    for name in LIST_FIELDS:
+        if name in data and not (isinstance(data[name], list) and all(isinstance(c, str) for c in data[name])):
+            return f"{name} must be a list of strings"
+    if 'sessions' in data and not data['sessions']:
+        return "sessions must list at least one session"
+    fixed = data.get('fixedCourses', {})
+    if not isinstance(fixed, dict) or not all(
+            isinstance(cs, list) and all(isinstance(c, str) for c in cs) for cs in fixed.values()):
+        return "fixedCourses must map terms to lists of course codes"
+    return None
+
+
+def get_batch_executor() -> Optional[ProcessPoolExecutor]:
+    """Process pool shared by every batch, or None where processes are unavailable"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                try:
+                    _executor = ProcessPoolExecutor(max_workers=BATCH_WORKERS, initializer=_init_worker)
+                except (OSError, NotImplementedError, ImportError) as e:
+                    # e.g. serverless runtimes without working semaphores
+                    print(f"[Plan Batch] Process pool unavailable, planning inline: {e}")
+                    return None
+    return _executor
+
+
+def run_batch(plan_requests: List[dict], ordered: bool = True) -> Iterator[Tuple[int, dict]]:
+    """Yield (index, result) for each planning request.
+
+    With ordered=True results come back in request order; otherwise each one is
+    yielded as soon as its worker finishes. Entries that fail
+    validate_plan_request get a {"success": False, "error": ...} result.
+    """
+    # Malformed entries get their error here and never reach a worker
+    errors = {}
+    for index, data in enumerate(plan_requests):
+        error = validate_plan_request(data)
+        if error is not None:
+            errors[index] = {"success": False, "error": error}
+    valid = [index for index in range(len(plan_requests)) if index not in errors]
+
+    executor = get_batch_executor()
+    if executor is None:
+        for index, data in enumerate(plan_requests):
+            yield (index, errors[index]) if index in errors else _plan_one(index, data)
+        return
+
+    if ordered:
+        chunksize = max(1, len(valid) // (BATCH_WORKERS * 4))
+        planned = executor.map(_plan_one, valid, [plan_requests[i] for i in valid], chunksize=chunksize)
+        for index in range(len(plan_requests)):
+            yield (index, errors[index]) if index in errors else next(planned)
+    else:
+        futures = [executor.submit(_plan_one, index, plan_requests[index]) for index in valid]
+        yield from errors.items()
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from catalog import AVAILABILITY_HISTORY_PATH, CSV_FILE_PATH
+from course_utils import find_prerequisites_file
+
+
+PLAN_CACHE_MAX_ENTRIES = int(os.environ.get('PLAN_CACHE_MAX_ENTRIES', 2048))
+PLAN_CACHE_TTL = float(os.environ.get('PLAN_CACHE_TTL', 3600))
+PLAN_CACHE_MAX_BYTES = int(os.environ.get('PLAN_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+
+def _sorted_unique(courses) -> list:
+    return sorted(set(courses or []))
+
+
+def canonical_plan_key(data: dict, catalog_version: str) -> str:
+    """Hash of a /generate request with defaults filled in and order-free lists sorted.
+
+    Requests that can only differ in the order of completed or elective
+    courses map to the same key. The catalog version is part of the key so
+    plans built from an older catalog are never served.
+    """
+    fixed_courses = data.get('fixedCourses') or {}
+    normalized = {
+        'catalog': catalog_version,
+        'major': data.get('major', 'Software Engineering'),
+        'startYear': data.get('startYear', 2023),
+        'plannedYears': data.get('plannedYears', 4),
+        'maxUnitsPerSemester': data.get('maxUnitsPerSemester', 16),
+        'completedCourses': _sorted_unique(data.get('completedCourses')),
+        'electiveCourses': _sorted_unique(data.get('electiveCourses')),
+        'sessions': list(data.get('sessions', ['Fall', 'Winter', 'Spring'])),
+        'fixedCourses': {term: list(courses) for term, courses in fixed_courses.items()},
+        'strategy': data.get('strategy', 'dfs'),
+        'numPlans': data.get('numPlans', 1),
+        'timeBudgetMs': data.get('timeBudgetMs', 500),
+        'strict': data.get('strict', False),
+        'predictOfferings': data.get('predictOfferings', False),
+        'offeringThreshold': data.get('offeringThreshold', 0.5),
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class PlanCache:
+    """Thread-safe LRU cache of /generate results with a TTL and a memory cap.
+
+    Results are stored as their JSON encoding, which is what the size cap
+    counts, and decoded on every hit so callers can't change cached plans.
+    Everything is dropped when one of `watch_paths` changes on disk.
+    """
+
+    def __init__(self,
+                 max_entries: int = PLAN_CACHE_MAX_ENTRIES,
+                 ttl: float = PLAN_CACHE_TTL,
+                 max_bytes: int = PLAN_CACHE_MAX_BYTES,
+                 watch_paths: Iterable[str] = ()) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.watch_paths = tuple(watch_paths)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (expires_at, encoded result)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._signature = self.__source_signature()
+
+    def __source_signature(self) -> tuple:
+        signature = []
+        for path in self.watch_paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def __check_sources(self) -> None:
+        signature = self.__source_signature()
+        if signature != self._signature:
+            self._signature = signature
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def __drop(self, key: str) -> None:
+        _, encoded = self._entries.pop(key)
+        self._bytes -= len(encoded)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            self.__check_sources()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self.__drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            encoded = entry[1]
+        return json.loads(encoded)
+
+    def put(self, key: str, result: dict) -> None:
+        encoded = json.dumps(result, separators=(',', ':'))
+        if len(encoded) > self.max_bytes:
+            return
+        with self._lock:
+            self.__check_sources()
+            if key in self._entries:
+                self.__drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, encoded)
+            self._bytes += len(encoded)
+            # Least recently used entries go first
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self.__drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+plan_cache = PlanCache(watch_paths=(CSV_FILE_PATH, find_prerequisites_file(), AVAILABILITY_HISTORY_PATH))
@@ -0,0 +1,200 @@
+from catalog import CatalogSnapshot, get_catalog_snapshot
+from plan_cache import canonical_plan_key, plan_cache
+from planner import CoursePlanner, PLAN_STRATEGIES
+from term_windows import compute_term_windows, get_term_windows
+
+
+class InfeasiblePlanError(ValueError):
+    """A strict request asked for courses that cannot fit in the planned terms"""
+
+    def __init__(self, unschedulable: list) -> None:
+        courses = ', '.join(entry['course'] for entry in unschedulable)
+        super().__init__(f"Cannot schedule {courses} within the planned terms")
+        self.unschedulable = unschedulable
+
+
+def find_unschedulable(courses, catalog: CatalogSnapshot, windows, sessions: list, skip=(),
+                       availability=None) -> list:
+    """Requested courses that no plan can place, with the reason for each"""
+    if availability is None:
+        availability = catalog.availability
+    unschedulable = []
+    for course in sorted(set(courses) - set(skip)):
+        offered = set(availability.get(course, ())) & set(sessions)
+        if not offered:
+            unschedulable.append({"course": course, "reason": "notOffered"})
+        elif not windows.feasible(catalog.graph.id_of(course)):
+            unschedulable.append({"course": course, "reason": "prerequisitesNotMet"})
+    return unschedulable
+
+
+def predict_year_availability(catalog: CatalogSnapshot, start_year: int, planned_years: int,
+                              threshold: float) -> list:
+    """{course: sessions} for each planned year, from the availability history"""
+    # numpy is only imported by requests that ask for predictions
+    from availability_history import get_availability_history, predicted_availability
+
+    history = get_availability_history()
+    if history is None:
+        raise ValueError("predictOfferings needs an availability history, build it with "
+                         "scripts/build_availability_history.py")
+    return predicted_availability(history, range(start_year, start_year + planned_years), threshold)
+
+
+def merge_year_availability(catalog: CatalogSnapshot, year_availability: list) -> dict:
+    """Catalog courses with every session they may run in during any planned year"""
+    merged = {}
+    for availability in year_availability:
+        for course, sessions in availability.items():
+            if course in catalog.availability:
+                known = merged.setdefault(course, [])
+                known.extend(s for s in sessions if s not in known)
+    return merged
+
+
+def generate_plan(data: dict, catalog: CatalogSnapshot = None, verbose: bool = False) -> dict:
+    """Build the /generate response for one planning request.
+
+    Raises ValueError for an invalid request, and InfeasiblePlanError when a
+    `strict` request lists electives that cannot be scheduled. Kept free of
+    Flask so batch workers can call it directly.
+    """
+    # Extract parameters from request
+    major = data.get('major', 'Software Engineering')
+    start_year = data.get('startYear', 2023)
+    planned_years = data.get('plannedYears', 4)
+    max_units_per_sem = data.get('maxUnitsPerSemester', 16)
+    completed_courses = data.get('completedCourses', [])
+    elective_courses = data.get('electiveCourses', [])
+    sessions = data.get('sessions', ['Fall', 'Winter', 'Spring'])
+    fixed_courses = data.get('fixedCourses', {})
+    strategy = data.get('strategy', 'dfs')
+    num_plans = data.get('numPlans', 1)
+    time_budget_ms = data.get('timeBudgetMs', 500)
+    strict = data.get('strict', False)
+    predict_offerings = data.get('predictOfferings', False)
+    offering_threshold = data.get('offeringThreshold', 0.5)
+
+    if strategy not in PLAN_STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {list(PLAN_STRATEGIES)}")
+
+    # Shared catalog (courses, availability and both DAGs), parsed once per process
+    if catalog is None:
+        catalog = get_catalog_snapshot()
+
+    availability_dict = catalog.availability
+    year_availability = None
+    if predict_offerings:
+        # Plan each year against its recorded or predicted offerings instead of this year's
+        year_availability = predict_year_availability(catalog, start_year, planned_years, offering_threshold)
+        availability_dict = merge_year_availability(catalog, year_availability)
+
+    # Initialize the course planner with prerequisite information
+    planner = CoursePlanner(
+        data_path=None,
+        planned_years=planned_years,
+        max_units_per_sem=max_units_per_sem,
+        completed_courses=completed_courses,
+        sessions=sessions,
+        catalog=catalog,
+        year_availability=year_availability
+    )
+
+    # Filter courses based on availability and electives
+    courses_avail = {}
+
+    if elective_courses:
+        # If electives are specified, use only those (in code order, so the plan
+        # doesn't depend on how the request listed them)
+        for course in sorted(set(elective_courses)):
+            if course in availability_dict:
+                courses_avail[course] = availability_dict[course]
+    else:
+        # If no electives specified, use all available courses except completed ones
+        for course, terms in availability_dict.items():
+            if course not in completed_courses:
+                courses_avail[course] = terms
+
+    # Add fixed courses to the plan
+    if fixed_courses:
+        for term, courses in fixed_courses.items():
+            planner.fixed_core_course(term, courses)
+
+    # Earliest/latest term of every course for this setup, shared across requests
+    if year_availability is None:
+        windows = get_term_windows(catalog, sessions, planned_years, completed_courses,
+                                   offered=elective_courses or None, placed=planner.placed_terms)
+    else:
+        # Every session a course may run in some year, so the windows still only prune impossible terms
+        windows = compute_term_windows(catalog.closure, catalog.prereq_rules, courses_avail, sessions,
+                                       planned_years, completed_courses, planner.placed_terms)
+    unschedulable = []
+    if elective_courses:
+        unschedulable = find_unschedulable(elective_courses, catalog, windows, sessions,
+                                           skip=list(completed_courses) + list(planner.placed_terms),
+                                           availability=availability_dict)
+        if unschedulable and strict:
+            raise InfeasiblePlanError(unschedulable)
+
+    # Sort courses by availability (courses with fewer available terms first)
+    courses_avail = {k: v for k, v in sorted(courses_avail.items(), key=lambda item: len(item[1]))}
+
+    # Alternative plans come from the fixed-course state, so enumerate before build_plan
+    alternative_plans = []
+    if num_plans > 1:
+        for plan in planner.enumerate_plans(courses_avail, k=num_plans, time_budget=time_budget_ms / 1000):
+            alternative_plans.append({term: courses for term, courses in plan.items() if courses})
+
+    # Generate the plan
+    planner.build_plan(courses_avail, strategy=strategy, windows=windows)
+
+    # Format the result for the frontend
+    plan_result = {}
+    for term, courses in planner.schedule.items():
+        if courses:  # Only include terms with courses
+            plan_result[term] = courses
+
+    if verbose:
+        planner.display_schedule()
+
+    # Add additional metadata about the plan
+    result = {
+        "success": True,
+        "plan": plan_result,
+        "metadata": {
+            "major": major,
+            "startYear": start_year,
+            "plannedYears": planned_years,
+            "maxUnitsPerSemester": max_units_per_sem,
+            "sessions": sessions,
+            "completedCourses": completed_courses,
+            "electiveCourses": elective_courses,
+            "strategy": strategy,
+            "cycles": planner.cycles,
+            "catalogVersion": catalog.version,
+            "unschedulable": unschedulable,
+            "predictOfferings": predict_offerings
+        }
+    }
+
+    if num_plans > 1:
+        result["plans"] = alternative_plans
+
+    return result
+
+
+def generate_plan_cached(data: dict, catalog: CatalogSnapshot = None, verbose: bool = False) -> dict:
+    """generate_plan through the process-wide plan cache"""
+    if catalog is None:
+        catalog = get_catalog_snapshot()
+
+    key = canonical_plan_key(data, catalog.version)
+    result = plan_cache.get(key)
+    if result is None:
+        result = generate_plan(data, catalog, verbose=verbose)
+        plan_cache.put(key, result)
+    else:
+        # The key ignores list order; echo the lists back as this request sent them
+        result["metadata"]["completedCourses"] = data.get('completedCourses', [])
+        result["metadata"]["electiveCourses"] = data.get('electiveCourses', [])
+    return result
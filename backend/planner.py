@@ -1,6 +1,15 @@
-import pandas as pd
+import heapq
+import time
+from array import array
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Set, Optional
+from typing import Callable, Dict, Iterable, List, Set, Optional
+from catalog import CatalogSnapshot
+from catalog_csv import read_course_csv
+from course_graph import ClosureIndex, CourseGraph, compile_course_graph, compile_prereq_rules, find_cycles
+from term_windows import TermWindows, compute_term_windows
+
+
+PLAN_STRATEGIES = ('dfs', 'kahn')
 
 
 @dataclass
@@ -12,12 +21,22 @@ class CoursePlanner:
     sessions: list = None
     prereqs_dag: Dict[str, List[str]] = None
     forward_dag_input: Dict[str, List[str]] = None  # Renamed to avoid property conflict
+    catalog: CatalogSnapshot = None  # Shared read-only catalog, skips re-reading data_path
+    year_availability: list = None  # {course: sessions} per planned year, when offerings vary by year
     _cdict: dict = field(default=None, init=False)
     _pdag: dict = field(default=None, init=False)
     _fdag: dict = field(default=None, init=False)
+    _graph: CourseGraph = field(default=None, init=False)
+    _closure: ClosureIndex = field(default=None, init=False)
+    _rules: tuple = field(default=None, init=False)
     _session_val: dict = field(default=None, init=False)
+    _windows: TermWindows = field(default=None, init=False)
     _schedule: dict = field(default=None, init=False)
-    _visited: set = field(default=None, init=False)
+    _term_units: dict = field(default=None, init=False)
+    _placement: array = field(default=None, init=False)
+    _visited: bytearray = field(default=None, init=False)
+    _done_mask: int = field(default=0, init=False)
+    _cycles: list = field(default=None, init=False)
 
     @property
     def course_dict(self) -> dict:
@@ -31,18 +50,48 @@ class CoursePlanner:
     def forward_dag(self) -> dict:
         return self._fdag
     
+    @property
+    def graph(self) -> CourseGraph:
+        return self._graph
+
+    @property
+    def closure(self) -> ClosureIndex:
+        # Built on first use when the planner compiled its own graph
+        if self._closure is None:
+            self._closure = ClosureIndex(self._graph)
+        return self._closure
+
     @property
     def schedule(self) -> dict:
         return self._schedule
 
+    @property
+    def cycles(self) -> list:
+        return self._cycles
+
     def __post_init__(self) -> None:
-        self._cdict = self.__read_csv_to_dict()
-        
-        # Use provided prerequisite DAG if available, otherwise build from course dict
-        self._pdag = self.prereqs_dag if self.prereqs_dag else self.__build_pdag(self._cdict)
-        
-        # Use provided forward DAG if available, otherwise build from prereq DAG
-        self._fdag = self.forward_dag_input if self.forward_dag_input else self.__build_fdag(self._cdict)
+        if self.catalog is not None:
+            # Shared snapshot, never mutated by the planner
+            self._cdict = self.catalog.course_dict
+            self._pdag = self.prereqs_dag if self.prereqs_dag else self.catalog.prereq_dag
+            self._fdag = self.forward_dag_input if self.forward_dag_input else self.catalog.forward_dag
+        else:
+            self._cdict = self.__read_csv_to_dict()
+            
+            # Use provided prerequisite DAG if available, otherwise build from course dict
+            self._pdag = self.prereqs_dag if self.prereqs_dag else self.__build_pdag(self._cdict)
+            
+            # Use provided forward DAG if available, otherwise build from prereq DAG
+            self._fdag = self.forward_dag_input if self.forward_dag_input else self.__build_fdag(self._cdict)
+
+        # Reuse the snapshot's compiled graph unless the caller overrode the DAGs
+        if self.catalog is not None and not self.prereqs_dag and not self.forward_dag_input:
+            self._graph = self.catalog.graph
+            self._closure = self.catalog.closure
+            self._rules = self.catalog.prereq_rules
+        else:
+            self._graph = compile_course_graph(self._cdict, self._pdag, self._fdag)
+            self._rules = compile_prereq_rules(self._graph)
         
         self._session_val = {
             f'{s}{i}': i*len(self.sessions) + idx 
@@ -51,40 +100,20 @@ class CoursePlanner:
             }
         self._schedule = {k: [] for k in self._session_val.keys()}
 
-        self._visited = set()
+        # Running units per term and term index per course id (-1 while unplaced)
+        self._term_units = {k: 0 for k in self._session_val.keys()}
+        self._placement = array('i', [-1]) * len(self._graph)
+
+        # Visited by the search, and finished (completed or placed) as a course-id bitmask
+        self._visited = bytearray(len(self._graph))
+        self._done_mask = 0
+        self._cycles = []
         if self.completed_courses:
-            for course in self.completed_courses:
-                self._visited.add(course)
+            self.__mark_visited(self.completed_courses)
 
 
     def __read_csv_to_dict(self) -> dict:
-        df = pd.read_csv(self.data_path)
-        
-        # Check if we're using the courses_availability.csv format
-        if 'Course' in df.columns and 'Availability' in df.columns:
-            # Initialize a basic course dictionary with default values
-            course_dict = {}
-            for _, row in df.iterrows():
-                course_id = row['Course']
-                # For each course, create a tuple of (title, prerequisites, units)
-                # Using default values since we don't have detailed information
-                course_dict[course_id] = (
-                    course_id,  # Use course ID as title for now
-                    [],  # Empty prerequisites since we don't have that info
-                    4  # Default to 4 units per course
-                )
-            return course_dict
-        elif 'CoursesID' in df.columns:
-            # Original format
-            return {
-                row['CoursesID']: 
-                    (row['Title'], 
-                    [] if pd.isnull(row['Prerequisites']) else row['Prerequisites'].split('+'), 
-                    row['Units']) 
-                for _, row in df.iterrows()
-                }
-        else:
-            raise ValueError("Unsupported CSV format. Expected columns not found.")
+        return read_course_csv(self.data_path)
 
 
     def __build_pdag(self, course_dict: dict) -> dict:
@@ -103,76 +132,345 @@ class CoursePlanner:
         return dag
     
     
-    def __build_plan_dfs(self, course: str, courses_avail: dict) -> None:
+    def __mark_visited(self, courses: list) -> None:
+        # Courses outside the graph are no one's prerequisite, so they need no id
+        for course in courses:
+            i = self._graph.id_of(course)
+            if i >= 0:
+                self._visited[i] = 1
+                self._done_mask |= 1 << i
+
+
+    def __place(self, term: str, course: str) -> None:
+        self._term_units[term] += self._graph.units_of(course)
+        i = self._graph.id_of(course)
+        if i >= 0:
+            self._placement[i] = self._session_val[term]
+            self._done_mask |= 1 << i
+
+
+    def __unplace(self, term: str, course: str) -> None:
+        self._term_units[term] -= self._graph.units_of(course)
+        i = self._graph.id_of(course)
+        if i >= 0 and self._placement[i] == self._session_val[term]:
+            self._placement[i] = -1
+            self._done_mask &= ~(1 << i)
+
+
+    def __build_plan_dfs(self, course: int, courses_avail: list) -> None:
+        graph = self._graph
+
         # Base case
-        if course in self._visited:
+        if self._visited[course]:
             return
         
-        # Check prerequisites
-        if course in self._pdag:
-            prereqs = self._pdag[course]
-            # First process all prerequisites
-            for prereq in prereqs:
-                if prereq not in self._visited and prereq in courses_avail:
-                    self.__build_plan_dfs(prereq, courses_avail)
+        # First process all prerequisites
+        prereqs = graph.prereqs(course)
+        for prereq in prereqs:
+            if not self._visited[prereq] and courses_avail[prereq] is not None:
+                self.__build_plan_dfs(prereq, courses_avail)
         
         # Mark course as visited
-        self._visited.add(course)
+        self._visited[course] = 1
+
+        # Only scheduled if its prerequisite rule is met
+        self.__try_place(course, courses_avail[course])
+
+
+    def __release_order(self, courses_avail: list) -> tuple:
+        graph = self._graph
+        n = len(graph)
+
+        # Courses still to be planned; prerequisites outside this set must already be done
+        pending = bytearray(n)
+        for i, sessions in enumerate(courses_avail):
+            if sessions is not None and not self._visited[i]:
+                pending[i] = 1
+
+        indegree = array('i', [0]) * n
+        for i in range(n):
+            if pending[i]:
+                for p in graph.prereqs(i):
+                    indegree[i] += pending[p]
+
+        # Longest chain of pending dependents, from a FIFO topological pass
+        order = [i for i in range(n) if pending[i] and indegree[i] == 0]
+        remaining = array('i', indegree)
+        for i in order:
+            for d in graph.dependents(i):
+                if pending[d]:
+                    remaining[d] -= 1
+                    if remaining[d] == 0:
+                        order.append(d)
+        height = array('i', [0]) * n
+        for i in reversed(order):
+            for d in graph.dependents(i):
+                if pending[d] and height[d] + 1 > height[i]:
+                    height[i] = height[d] + 1
+
+        # Longest chain first, then fewest offered sessions, then course code
+        def priority(i: int) -> tuple:
+            return (-height[i], len(courses_avail[i]), graph.codes[i], i)
+
+        release = []
+        heap = [priority(i) for i in range(n) if pending[i] and indegree[i] == 0]
+        heapq.heapify(heap)
+        while heap:
+            course = heapq.heappop(heap)[-1]
+            release.append(course)
+            for d in graph.dependents(course):
+                if pending[d]:
+                    indegree[d] -= 1
+                    if indegree[d] == 0:
+                        heapq.heappush(heap, priority(d))
+
+        return release, pending
+
+
+    def __build_plan_kahn(self, courses_avail: list) -> None:
+        graph = self._graph
+        order, pending = self.__release_order(courses_avail)
+
+        for course in order:
+            self._visited[course] = 1
+
+            # A prerequisite that never got a term (or was never offered) blocks the course
+            self.__try_place(course, courses_avail[course])
+
+        # Anything never released is on, or downstream of, a prerequisite cycle
+        stuck = [i for i in range(len(graph)) if pending[i] and not self._visited[i]]
+        self._cycles = [[graph.codes[i] for i in cycle] for cycle in find_cycles(graph, stuck)]
+
+
+    def __prereq_window(self, course: int, placement: array, done: int) -> Optional[int]:
+        # Latest prerequisite term of the earliest-finishing satisfied clause, None if none is
+        rule = self._rules[course]
+        if not rule:
+            return -1
+
+        window = None
+        for clause in rule:
+            if clause & ~done:
+                continue
+            term = -1
+            while clause:
+                low = clause & -clause
+                term = max(term, placement[low.bit_length() - 1])
+                clause ^= low
+            if window is None or term < window:
+                window = term
+        return window
+
+
+    def __offered(self, course: str, year: int, session: str) -> bool:
+        # Without per-year availability a course runs in the same sessions every year
+        return self.year_availability is None or session in self.year_availability[year].get(course, ())
+
+
+    def __try_place(self, course: int, sessions: Iterable[str]) -> bool:
+        graph = self._graph
+
+        # Add course to schedule logic
+        min_window = self.__prereq_window(course, self._placement, self._done_mask)
+        if min_window is None:
+            return False  # Don't schedule this course if prerequisites aren't met
+
+        # Nothing before the course's earliest possible term can work
+        if self._windows is not None:
+            if not self._windows.feasible(course):
+                return False
+            min_window = max(min_window, self._windows.earliest[course] - 1)
 
         # Lambda functions
         def check_max_units(k: str) -> bool:
-            total_units = sum([self._cdict[c][2] for c in self._schedule[k]])
-            return total_units + self._cdict[course][2] <= self.max_units_per_sem
+            return self._term_units[k] + graph.units[course] <= self.max_units_per_sem
         
-        def get_score(base: int, dag: dict, extrema: Callable[[int, int], int]) -> int:
+        def get_score(base: int, edges: Iterable[int], extrema: Callable[[int, int], int]) -> int:
             score = base
-            for n in dag.get(course, []):
-                for k, v in self._schedule.items():
-                    if n in v:
-                        score = extrema(score, self._session_val[k])
+            for n in edges:
+                if self._placement[n] >= 0:
+                    score = extrema(score, self._placement[n])
             return score
 
-        # Add course to schedule logic
-        min_window = get_score(-1, self._pdag, max)
-        max_window = get_score(self.planned_years * len(self.sessions), self._fdag, min)
-
-        # Check if all prerequisites are already in the schedule
-        prereqs_met = True
-        for prereq in self._pdag.get(course, []):
-            if prereq not in self._visited:
-                prereqs_met = False
-                break
-        
-        if not prereqs_met:
-            return  # Don't schedule this course if prerequisites aren't met
-        
-        # Try to schedule the course
-        for i in range(self.planned_years):
-            for session in courses_avail.get(course, []):
+        max_window = get_score(self.planned_years * len(self.sessions), graph.dependents(course), min)
+
+        # Try to schedule the course, skipping years that end before its prerequisites
+        for i in range(max(0, min_window // len(self.sessions)), self.planned_years):
+            for session in sessions or []:
                 k = f'{session}{i}'
                 if k not in self._session_val:
                     continue  # Skip if term is not in planned sessions
+                if self.year_availability is not None and not self.__offered(graph.codes[course], i, session):
+                    continue  # Or if the course isn't expected to run that year
                 
                 score = self._session_val[k]
                 if check_max_units(k) and min_window < score < max_window:
-                    self._schedule[k].append(course)
-                    return
+                    self._schedule[k].append(graph.codes[course])
+                    self.__place(k, graph.codes[course])
+                    return True
+        return False
     
     
     def fixed_core_course(self, semester: str, courses: list) -> None:
         if semester not in self._schedule:
             return  # Skip if semester is not in planned sessions
         
+        for course in self._schedule[semester]:
+            self.__unplace(semester, course)
+
         self._schedule[f'{semester}'] = courses
         for course in courses:
-            self._visited.add(course)
+            self.__place(semester, course)
+        self.__mark_visited(courses)
+
+
+    def load_plan(self, plan: dict) -> None:
+        # Place an existing plan's courses where they are, e.g. before replan
+        for term, courses in plan.items():
+            if term not in self._schedule:
+                continue  # Skip if term is not in planned sessions
+            for course in courses:
+                if course not in self._schedule[term]:
+                    self._schedule[term].append(course)
+                    self.__place(term, course)
+            self.__mark_visited(courses)
+
+
+    def __remove(self, course: str) -> Optional[str]:
+        i = self._graph.id_of(course)
+        if i >= 0 and self._placement[i] < 0:
+            return None
+        for term, courses in self._schedule.items():
+            if course in courses and (i < 0 or self._session_val[term] == self._placement[i]):
+                courses.remove(course)
+                self.__unplace(term, course)
+                return term
+        return None
+
+
+    def replan(self, edits: List[dict], courses_avail: dict) -> Dict[str, Optional[str]]:
+        """Apply edits to the current plan, re-placing only the edited courses' descendants.
+
+        Each edit is {'op': 'add' | 'remove' | 'move' | 'complete', 'course': code},
+        with a 'term' for 'move' (and optionally 'add') that pins the course there.
+        Courses downstream of an edit (per the closure index) that were in the plan
+        and are offered in courses_avail are taken out and placed again in
+        topological order, as is a course added without a term; the rest of the
+        plan is left alone and courses it never had are not pulled in. Returns
+        {course: new term or None} for every course whose term changed.
+        """
+        graph = self._graph
+        closure = self.closure
+        before = {}
+        seeds = 0
+        settled = set()  # Edited courses that must not be placed again
+        planned = set(self.placed_terms)  # Only these (and added courses) are placed again
+
+        def remove(course: str) -> None:
+            term = self.__remove(course)
+            before.setdefault(course, term)
+
+        for edit in edits:
+            op, course, term = edit.get('op'), edit.get('course'), edit.get('term')
+            if op not in ('add', 'remove', 'move', 'complete'):
+                raise ValueError(f"Unknown edit op '{op}'")
+            if op == 'move' and term not in self._schedule:
+                raise ValueError(f"Cannot move {course} to unplanned term '{term}'")
+
+            remove(course)
+            i = graph.id_of(course)
+            if i >= 0:
+                seeds |= 1 << i
+                self._visited[i] = 0
+
+            if op == 'add':
+                planned.add(course)
+            if op == 'complete':
+                self.__mark_visited([course])
+                settled.add(course)
+            elif op == 'remove':
+                settled.add(course)
+            elif term in self._schedule:
+                # A pinned course stays where the student put it
+                self._schedule[term].append(course)
+                self.__place(term, course)
+                self.__mark_visited([course])
+                settled.add(course)
+
+        # Edited courses and everything downstream of them, minus the settled ones
+        affected = seeds
+        mask = seeds
+        while mask:
+            low = mask & -mask
+            affected |= closure.descendant_masks[low.bit_length() - 1]
+            mask ^= low
+
+        courses = []
+        while affected:
+            low = affected & -affected
+            i = low.bit_length() - 1
+            affected ^= low
+            code = graph.codes[i]
+            if code in planned and code not in settled and code in courses_avail:
+                courses.append(i)
+                remove(code)
+
+        for i in sorted(courses, key=lambda i: closure.rank[i]):
+            self._visited[i] = 1
+            self.__try_place(i, courses_avail[graph.codes[i]])
+
+        changed = {}
+        for course, old_term in before.items():
+            new_term = next((t for t, cs in self._schedule.items() if course in cs), None)
+            if new_term != old_term:
+                changed[course] = new_term
+        return changed
+
+
+    def __avail_by_id(self, courses_avail: dict) -> list:
+        # Availability indexed by course id, None for courses not offered to this plan
+        avail_by_id = [None] * len(self._graph)
+        for k, sessions in courses_avail.items():
+            i = self._graph.id_of(k)
+            if i >= 0:
+                avail_by_id[i] = sessions
+        return avail_by_id
 
 
-    def build_plan(self, courses_avail: dict) -> None:
-        # Process all courses that are available
-        for k in courses_avail.keys():
-            if k in self._cdict:  # Only process courses that exist in our dictionary
-                self.__build_plan_dfs(k, courses_avail)
+    @property
+    def placed_terms(self) -> Dict[str, int]:
+        """Term index of every course placed so far (fixed or loaded courses before build_plan)"""
+        return {self._graph.codes[i]: t for i, t in enumerate(self._placement) if t >= 0}
+
+
+    def term_windows(self, courses_avail: dict) -> TermWindows:
+        """Earliest/latest term of every course given the current completed and placed courses"""
+        return compute_term_windows(self.closure, self._rules, courses_avail, self.sessions,
+                                    self.planned_years, self.completed_courses or (), self.placed_terms)
+
+
+    def build_plan(self, courses_avail: dict, strategy: str = 'dfs', windows: TermWindows = None) -> None:
+        """Schedule the courses in courses_avail around the completed and fixed courses.
+
+        With `windows` (see term_windows, or term_windows.get_term_windows for a
+        cached copy) courses that can never fit are skipped and placement starts
+        at each course's earliest term. They must come from the same
+        courses_avail, completed and fixed courses.
+        """
+        if strategy not in PLAN_STRATEGIES:
+            raise ValueError(f"Unknown planning strategy '{strategy}'. Expected one of {PLAN_STRATEGIES}")
+
+        self._windows = windows
+        avail_by_id = self.__avail_by_id(courses_avail)
+        if strategy == 'kahn':
+            self.__build_plan_kahn(avail_by_id)
+        else:
+            # Process all courses that are available
+            for k in courses_avail.keys():
+                if k in self._cdict:  # Only process courses that exist in our dictionary
+                    self.__build_plan_dfs(self._graph.ids[k], avail_by_id)
+        # Windows only hold for this build; replan moves courses around them
+        self._windows = None
 
         # Print out self.prereq_dag
         print("Prerequisite DAG:")
@@ -180,6 +478,114 @@ class CoursePlanner:
             print(f"{course}: {prereqs}")
                 
                 
+    def enumerate_plans(self, courses_avail: dict, k: int = 3, beam_width: int = 8,
+                        time_budget: float = None) -> List[dict]:
+        """Return up to k alternative schedules, best first.
+
+        Courses are taken in the Kahn release order and each partial plan in the
+        beam branches over the course's feasible terms. Partial plans with the same
+        term loads and the same terms for courses later courses still depend on are
+        interchangeable from then on, so a worse-scored one is dropped. Once
+        time_budget seconds have passed the remaining courses are placed greedily.
+        Plans are ranked by unplaced courses, then last term used, then total term index.
+        Every plan is only complete once the beam has passed the last course, so
+        they are all returned together. The planner's own schedule is left untouched.
+        """
+        graph = self._graph
+        avail_by_id = self.__avail_by_id(courses_avail)
+        order, pending = self.__release_order(avail_by_id)
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        n_terms = len(self._session_val)
+
+        # Last position in the order at which each course is still needed as a prerequisite
+        last_use = {}
+        for step, course in enumerate(order):
+            for p in graph.prereqs(course):
+                if pending[p]:
+                    last_use[p] = step
+
+        # A beam entry is (score, term per course id, units per term index, finished-course mask)
+        beam = [((0, -1, 0), self._placement, [self._term_units[t] for t in self._session_val], self._done_mask)]
+        live = []
+
+        for step, course in enumerate(order):
+            units = graph.units[course]
+            offered = sorted(self._session_val[f'{session}{year}']
+                             for year in range(self.planned_years)
+                             for session in avail_by_id[course]
+                             if f'{session}{year}' in self._session_val
+                             and self.__offered(graph.codes[course], year, session))
+            branch = beam_width
+            if deadline is not None and time.perf_counter() >= deadline:
+                # Out of time: finish the k best partial plans greedily
+                branch = 1
+                beam = beam[:k]
+
+            live = [c for c in live if last_use[c] > step]
+            keeps_course = last_use.get(course, -1) > step
+
+            candidates = []
+            for parent, (score, placement, term_units, done) in enumerate(beam):
+                lo, hi = self.__prereq_window(course, placement, done), n_terms
+                if lo is None:
+                    lo = n_terms  # No prerequisite clause is met, so the course gets no term
+                for d in graph.dependents(course):
+                    if placement[d] >= 0:
+                        hi = min(hi, placement[d])
+
+                options = [t for t in offered
+                           if lo < t < hi and term_units[t] + units <= self.max_units_per_sem][:branch]
+                for t in options:
+                    candidates.append(((score[0], max(score[1], t), score[2] + t), parent, t))
+                if not options:
+                    candidates.append(((score[0] + 1, score[1], score[2]), parent, -1))
+            candidates.sort(key=lambda c: c[0])
+
+            next_beam = []
+            best = {}
+            for score, parent, t in candidates:
+                _, placement, term_units, done = beam[parent]
+                signature = (
+                    tuple(term_units[i] + (units if i == t else 0) for i in range(n_terms)),
+                    tuple(placement[c] for c in live),
+                    t if keeps_course else None
+                )
+                if best.setdefault(signature, score) < score:
+                    continue  # Dominated by a better-scored plan with the same future
+
+                placement = array('i', placement)
+                placement[course] = t
+                term_units = list(term_units)
+                if t >= 0:
+                    term_units[t] += units
+                    done |= 1 << course
+                next_beam.append((score, placement, term_units, done))
+                if len(next_beam) == beam_width:
+                    break
+
+            beam = next_beam
+            if keeps_course:
+                live.append(course)
+
+        terms = list(self._session_val)
+        plans = []
+        seen = set()
+        for _, placement, _, _ in beam:
+            key = placement.tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+
+            plan = {term: list(courses) for term, courses in self._schedule.items()}
+            for course in order:
+                if placement[course] >= 0:
+                    plan[terms[placement[course]]].append(graph.codes[course])
+            plans.append(plan)
+            if len(plans) == k:
+                break
+        return plans
+
+
     def display_schedule(self) -> None:
         print('-'*50, '\n')
         for k, v in self._schedule.items():
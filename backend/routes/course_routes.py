@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.course import Course
 from extensions import db
+from course_search import SEARCH_LIMIT, get_course_search_index, index_course, unindex_course
 
 course_bp = Blueprint('course', __name__)
 
@@ -35,13 +36,11 @@ def search_courses():
     if not query or len(query) < 2:
         return jsonify({"error": "Search query must be at least 2 characters"}), 400
     
-    courses = Course.query.filter(
-        (Course.class_name.ilike(f'%{query}%')) | 
-        (Course.title.ilike(f'%{query}%'))
-    ).limit(50).all()
+    limit = min(request.args.get('limit', SEARCH_LIMIT, type=int), SEARCH_LIMIT)
     
+    # Ranked, typo-tolerant match on code, title and description from the in-memory index
     return jsonify({
-        "results": [course.to_dict() for course in courses]
+        "results": get_course_search_index().search(query, limit)
     }), 200
 
 @course_bp.route('/prerequisites/<class_name>', methods=['GET'])
@@ -98,6 +97,7 @@ def create_course():
     
     db.session.add(course)
     db.session.commit()
+    index_course(course.to_dict())
     
     return jsonify(course.to_dict()), 201
 
@@ -127,6 +127,7 @@ def update_course(course_id):
     course.grading_option = data.get('grading_option', course.grading_option)
     
     db.session.commit()
+    index_course(course.to_dict())
     
     return jsonify(course.to_dict()), 200
 
@@ -145,5 +146,6 @@ def delete_course(course_id):
     
     db.session.delete(course)
     db.session.commit()
+    unindex_course(course_id)
     
     return jsonify({"message": "Course deleted successfully"}), 200
@@ -2,6 +2,8 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.plan import Plan
 from extensions import db
+from catalog import get_catalog_snapshot
+from optimizer import rule_clauses, short_code, solve_min_terms
 
 plan_bp = Blueprint('plan', __name__)
 
@@ -114,29 +116,51 @@ def validate_plan():
 @plan_bp.route('/optimize', methods=['POST'])
 @jwt_required(optional=True)
 def optimize_plan():
-    """Generate an optimized academic plan"""
+    """Generate the plan with the fewest terms for a set of required courses"""
     data = request.get_json()
     
-    # This would generate an optimized plan based on constraints
-    # For now, return a mock response
+    # Catalog availability is keyed by short codes (ICS 46, not I&C SCI 46)
+    required_courses = [short_code(c) for c in data.get('requiredCourses', [])]
+    completed_courses = [short_code(c) for c in data.get('completedCourses', [])]
+    sessions = data.get('sessions', ['Fall', 'Winter', 'Spring'])
+    max_units_per_sem = data.get('maxUnitsPerSemester', 16)
+    start_year = data.get('startYear', 2023)
+    node_budget = data.get('nodeBudget', 200000)
+    time_budget_ms = data.get('timeBudgetMs', 2000)
+    
+    if not required_courses:
+        return jsonify({"error": "requiredCourses must list at least one course"}), 400
+    if not sessions:
+        return jsonify({"error": "sessions must list at least one session"}), 400
+    
+    catalog = get_catalog_snapshot()
+    result = solve_min_terms(
+        required_courses,
+        catalog.availability,
+        catalog.prereq_dag,
+        max_units=max_units_per_sem,
+        sessions=sessions,
+        completed=completed_courses,
+        units={c: catalog.graph.units_of(c) for c in required_courses},
+        node_budget=node_budget,
+        time_budget=time_budget_ms / 1000,
+        # "A or B" prerequisites, as CoursePlanner applies them
+        prereq_clauses=rule_clauses(catalog.graph, catalog.prereq_rules, required_courses)
+    )
     
-    mock_optimized_plan = {
-        "planData": {
-            "terms": [
-                {
-                    "term": "Fall 2023",
-                    "courses": ["COMPSCI 161", "COMPSCI 171", "IN4MATX 115", "GEN ED"]
-                },
-                {
-                    "term": "Winter 2024",
-                    "courses": ["COMPSCI 122A", "COMPSCI 143A", "STATS 67", "GEN ED"]
-                },
-                {
-                    "term": "Spring 2024",
-                    "courses": ["COMPSCI 142A", "COMPSCI 145", "COMPSCI 132", "GEN ED"]
-                }
-            ]
-        }
-    }
+    # Academic years start in Fall: Fall 2023, Winter 2024, Spring 2024, Fall 2024, ...
+    terms = []
+    for i, courses in enumerate(result.terms):
+        session = sessions[i % len(sessions)]
+        year = start_year + i // len(sessions) + (session != 'Fall')
+        terms.append({"term": f"{session} {year}", "courses": courses})
     
-    return jsonify(mock_optimized_plan), 200
+    return jsonify({
+        "planData": {
+            "terms": terms
+        },
+        "termCount": len(terms),
+        "optimal": result.optimal,
+        "nodesExplored": result.nodes,
+        "unschedulable": result.unschedulable
+    }), 200
@@ -1,17 +1,19 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
-import pandas as pd
 from course_utils import (
-    load_course_prerequisites, 
-    create_prerequisites_dag, 
-    create_forward_dag,
     short_to_full_course_code,
     full_to_short_course_code
 )
+from catalog import get_catalog_snapshot
+from course_search import SUGGESTION_LIMIT, get_course_code_index
 import json # Import the json module
 from planner import CoursePlanner # Assuming CoursePlanner is in the same directory or accessible
+from plan_generation import InfeasiblePlanError, generate_plan_cached
+from plan_cache import plan_cache
+from plan_batch import MAX_BATCH_SIZE, run_batch
 from scraper import scape_read_csv # Assuming scraper.py is accessible
+from catalog_csv import read_availability_csv
 # models.course and extensions.db might not be needed if this is the only db interaction here
 # from models.course import Course # Import the Course model
 # from extensions import db # Import db instance
@@ -28,15 +30,7 @@ print(f"[Planner Routes] PREREQS_JSON_FILE_PATH resolved to: {PREREQS_JSON_FILE_
 
 def parse_availability_csv(csv_path):
     """Parse the courses_availability.csv file into a dictionary"""
-    df = pd.read_csv(csv_path)
-    course_dict = {}
-    
-    for _, row in df.iterrows():
-        course_id = row['Course']
-        availability = row['Availability']
-        course_dict[course_id] = availability.split('+') if not pd.isnull(availability) else []
-    
-    return course_dict
+    return read_availability_csv(csv_path)
 
 @planner_bp.route('/generate', methods=['POST'])
 @jwt_required(optional=True) # Allow anonymous access or use JWT if available
@@ -44,85 +38,107 @@ def generate_plan_route():
     """Generate an academic plan based on input parameters"""
     data = request.get_json()
     
-    # Extract parameters from request
-    major = data.get('major', 'Software Engineering')
-    start_year = data.get('startYear', 2023)
+    try:
+        result = generate_plan_cached(data, verbose=True)
+    except InfeasiblePlanError as e:
+        return jsonify({"error": str(e), "unschedulable": e.unschedulable}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(result), 200
+
+@planner_bp.route('/generate-batch', methods=['POST'])
+@jwt_required(optional=True)
+def generate_batch_route():
+    """Generate plans for many planning requests at once across worker processes"""
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object with a requests list"}), 400
+    
+    plan_requests = data.get('requests', [])
+    if not isinstance(plan_requests, list) or not plan_requests:
+        return jsonify({"error": "requests must be a non-empty list of planning requests"}), 400
+    if len(plan_requests) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} requests per batch"}), 400
+    
+    if data.get('stream', False):
+        # One JSON object per line, in completion order, each tagged with its request index
+        def stream():
+            for index, result in run_batch(plan_requests, ordered=False):
+                yield json.dumps({"index": index, **result}) + "\n"
+        return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
+    
+    results = [result for _, result in run_batch(plan_requests)]
+    return jsonify({"results": results}), 200
+
+@planner_bp.route('/cache-stats', methods=['GET'])
+def get_plan_cache_stats():
+    """Hit/miss counters and size of the /generate plan cache"""
+    return jsonify(plan_cache.stats()), 200
+
+@planner_bp.route('/replan', methods=['POST'])
+@jwt_required(optional=True)
+def replan_route():
+    """Apply edits to an existing plan, re-placing only the courses they affect"""
+    data = request.get_json()
+    
+    plan = data.get('plan', {})
+    edits = data.get('edits', [])
     planned_years = data.get('plannedYears', 4)
     max_units_per_sem = data.get('maxUnitsPerSemester', 16)
     completed_courses = data.get('completedCourses', [])
-    elective_courses = data.get('electiveCourses', [])
     sessions = data.get('sessions', ['Fall', 'Winter', 'Spring'])
-    fixed_courses = data.get('fixedCourses', {})
     
-    # Load course prerequisites
-    prereqs_dict = load_course_prerequisites()
-    prereqs_dag = create_prerequisites_dag(prereqs_dict)
-    forward_dag = create_forward_dag(prereqs_dag)
-    
-    # Initialize the course planner with prerequisite information
+    catalog = get_catalog_snapshot()
     planner = CoursePlanner(
         data_path=CSV_FILE_PATH,
         planned_years=planned_years,
         max_units_per_sem=max_units_per_sem,
         completed_courses=completed_courses,
         sessions=sessions,
-        prereqs_dag=prereqs_dag,
-        forward_dag_input=forward_dag  # Note the renamed parameter
+        catalog=catalog
     )
+    planner.load_plan(plan)
     
-    # Load course availability directly
-    availability_dict = parse_availability_csv(CSV_FILE_PATH)
-    
-    # Filter courses based on availability and electives
-    courses_avail = {}
-    
-    if elective_courses:
-        # If electives are specified, use only those
-        for course in elective_courses:
-            if course in availability_dict:
-                courses_avail[course] = availability_dict[course]
-    else:
-        # If no electives specified, use all available courses except completed ones
-        for course, terms in availability_dict.items():
-            if course not in completed_courses:
-                courses_avail[course] = terms
-    
-    # Add fixed courses to the plan
-    if fixed_courses:
-        for term, courses in fixed_courses.items():
-            planner.fixed_core_course(term, courses)
-    
-    # Sort courses by availability (courses with fewer available terms first)
-    courses_avail = {k: v for k, v in sorted(courses_avail.items(), key=lambda item: len(item[1]))}
+    try:
+        changed = planner.replan(edits, catalog.availability)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Generate the plan
-    planner.build_plan(courses_avail)
+    plan_result = {term: courses for term, courses in planner.schedule.items() if courses}
     
-    # Format the result for the frontend
-    plan_result = {}
-    for term, courses in planner.schedule.items():
-        if courses:  # Only include terms with courses
-            plan_result[term] = courses
-
-    # display_schedule
-    planner.display_schedule()
-    
-    # Add additional metadata about the plan
-    result = {
+    return jsonify({
         "success": True,
         "plan": plan_result,
-        "metadata": {
-            "major": major,
-            "startYear": start_year,
-            "plannedYears": planned_years,
-            "maxUnitsPerSemester": max_units_per_sem,
-            "sessions": sessions,
-            "completedCourses": completed_courses,
-            "electiveCourses": elective_courses
-        }
-    }
-    
-    return jsonify(result), 200
+        "changed": changed
+    }), 200
+
+@planner_bp.route('/course-closure/<path:course>', methods=['GET'])
+def get_course_closure(course):
+    """Every course required before, and unlocked by, a course"""
+    closure = get_catalog_snapshot().closure
+    course = full_to_short_course_code(course)
+    if course not in closure.graph:
+        return jsonify({"error": "Course not found"}), 404
+    
+    return jsonify({
+        "course": course,
+        "prerequisites": closure.ancestors(course),
+        "unlocks": closure.descendants(course)
+    }), 200
+
+@planner_bp.route('/course-levels', methods=['GET'])
+def get_course_levels():
+    """Topological order, prerequisite depth and cycles of the whole catalog, for graph rendering"""
+    closure = get_catalog_snapshot().closure
+    codes = closure.graph.codes
+    order = sorted((i for i in range(len(codes)) if closure.levels[i] >= 0), key=closure.rank.__getitem__)
+    
+    return jsonify({
+        "order": [codes[i] for i in order],
+        "levels": {codes[i]: closure.levels[i] for i in order},
+        "cycles": [[codes[i] for i in cycle] for cycle in closure.cycles]
+    }), 200
 
 @planner_bp.route('/course-availability', methods=['GET'])
 def get_course_availability():
@@ -141,22 +157,19 @@ def get_course_availability():
 
 @planner_bp.route('/completed-suggestions', methods=['GET'])
 def get_completed_suggestions():
-    print("[Planner Routes] Attempting to get completed course suggestions.")
-    if not os.path.exists(CSV_FILE_PATH):
-        print(f"[Planner Routes] Error: CSV file not found at {CSV_FILE_PATH} for suggestions.")
-        return jsonify({"error": "Course data for suggestions not found on server."}), 500
-        
+    """Course codes for the completed-courses typeahead.
+
+    ?prefix= matches short and full department spellings alike ('CS 16' and
+    'COMPSCI 16' both suggest CS 161) and returns at most ?limit= codes;
+    without a prefix every course is returned, as before.
+    """
+    prefix = request.args.get('prefix', '')
+    limit = request.args.get('limit', SUGGESTION_LIMIT if prefix else None, type=int)
     try:
-        df = pd.read_csv(CSV_FILE_PATH)
-        if 'Course' not in df.columns:
-            print("[Planner Routes] Error: 'Course' column missing in CSV for suggestions.")
-            return jsonify({"error": "Invalid course data format for suggestions."}), 500
-            
-        suggestions = df['Course'].tolist()
-        print(f"[Planner Routes] Completed course suggestions loaded. Number of suggestions: {len(suggestions)}")
+        suggestions = get_course_code_index().complete(prefix, limit)
         return jsonify({"suggestions": suggestions}), 200
     except Exception as e:
-        print(f"[Planner Routes] Error generating completed course suggestions from CSV: {e}")
+        print(f"[Planner Routes] Error generating completed course suggestions: {e}")
         return jsonify({"error": "Failed to load completed course suggestions"}), 500
 
 @planner_bp.route('/course-prerequisites', methods=['GET'])
@@ -1,7 +1,26 @@
-import pandas as pd
-from urllib.request import urlopen
-from typing import NamedTuple
+import contextlib
+import http.client
+import os
+import queue
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
 from course_utils import short_to_full_course_code, full_to_short_course_code
+from catalog_csv import read_availability_csv, write_availability_csv
+from listing_cache import CachedListing, ListingCache
+
+
+SCRAPE_WORKERS = int(os.environ.get('SCRAPE_WORKERS', 8))
+SCRAPE_TIMEOUT = float(os.environ.get('SCRAPE_TIMEOUT', 30))
+SCRAPE_RETRIES = int(os.environ.get('SCRAPE_RETRIES', 3))
+SCRAPE_BACKOFF = float(os.environ.get('SCRAPE_BACKOFF', 0.5))
+LISTING_CHUNK_SIZE = 64 * 1024
+
+# Responses worth asking for again; anything else non-200 is a real answer
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 class UCIScaperIdentifier(NamedTuple):
@@ -14,64 +33,308 @@ class UCIScaperIdentifier(NamedTuple):
     course_idx: str = 'string('
 
 
-def scrape_avail_listings(year: int, department: str, level: str = 'ALL', program: str = 'ALL') -> dict:
-    uid = UCIScaperIdentifier()
-    url = f'{uid.url_link}?year={year}&level={level}&department={department}&program={program}'
-    html = urlopen(url).read().decode(uid.decoder)
-    # print(html)
-    sidx = html.find(uid.stable)
-    eidx = html.find(uid.estable, sidx)
+class ScrapeError(Exception):
+    """A listing page that could not be fetched, even after retries"""
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+
+
+class ConnectionPool:
+    """Keep-alive connections to the listing host, shared by the scraper threads.
+
+    At most `size` idle connections are kept; a thread that finds none idle
+    opens a new one, so with `size` worker threads no more than `size`
+    sockets are ever open. `timeout` applies to every connect and read.
+    """
+
+    def __init__(self, url: str, size: int = SCRAPE_WORKERS, timeout: float = SCRAPE_TIMEOUT) -> None:
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.path = parts.path or '/'
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+
+    def __connect(self) -> http.client.HTTPConnection:
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
 
-    def strip(string: str) -> str:
-        return string.replace('"', '').replace(' ', '').replace('\n', '')
+    def __release(self, conn: http.client.HTTPConnection) -> None:
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
 
-    course_availability = {}
+    @contextlib.contextmanager
+    def open(self, query: str, headers: Optional[dict] = None) -> Iterator[http.client.HTTPResponse]:
+        """GET `query` on a pooled connection and yield the response with its body unread"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self.__connect()
 
-    while True:
-        if sidx == -1 or eidx == -1:
+        try:
+            conn.request('GET', f'{self.path}?{query}', headers=headers or {})
+            response = conn.getresponse()
+            yield response
+        except BaseException:
+            # The server may have dropped an idle connection, never reuse a broken one
+            conn.close()
+            raise
+
+        # A connection is only reusable once its response has been read to the end
+        if response.will_close or not response.isclosed():
+            conn.close()
+        else:
+            self.__release(conn)
+
+    def get(self, query: str, headers: Optional[dict] = None) -> Response:
+        with self.open(query, headers) as response:
+            return Response(response.status, dict(response.getheaders()), response.read())
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def listing_query(year: int, department: str, level: str = 'ALL', program: str = 'ALL') -> str:
+    return urlencode({'year': year, 'level': level, 'department': department, 'program': program})
+
+
+def fetch_listing(pool: ConnectionPool, query: str, headers: Optional[dict] = None,
+                  retries: int = SCRAPE_RETRIES, backoff: float = SCRAPE_BACKOFF) -> Response:
+    """GET one listing page, retrying connection errors, timeouts and 429/5xx with exponential backoff"""
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            # Jittered so threads that failed together don't retry together
+            time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        try:
+            response = pool.get(query, headers)
+        except (OSError, http.client.HTTPException) as e:
+            error = e
+            continue
+        if response.status not in RETRY_STATUSES:
             break
+        error = f'HTTP {response.status}'
+    else:
+        raise ScrapeError(f'{pool.host}{pool.path}?{query} failed after {retries + 1} attempts: {error}')
 
-        aval_idx = html[sidx:html.find(uid.avail, sidx)]
-        availability = [s for s in uid.sessions if s in aval_idx]
+    if response.status >= 400:
+        raise ScrapeError(f'{pool.host}{pool.path}?{query} returned HTTP {response.status}')
+    return response
 
-        info = html[sidx:eidx]
 
-        cidx = info.find(uid.course_idx)    # Skip first instance
+@contextlib.contextmanager
+def open_listing(pool: ConnectionPool, query: str, headers: Optional[dict] = None,
+                 retries: int = SCRAPE_RETRIES, backoff: float = SCRAPE_BACKOFF) -> Iterator[http.client.HTTPResponse]:
+    """One listing page's response with the body unread, retried like fetch_listing.
 
-        cidx = info.find(uid.course_idx, cidx + 1)
-        ctitle = info[cidx + 11:cidx + 11 + len(department)]
-        ctitle = strip(ctitle)
+    Only getting the response is retried; a failure while the caller reads
+    the body raises ScrapeError, as part of it has already been used.
+    """
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        opened = False
+        try:
+            with pool.open(query, headers) as response:
+                if response.status in RETRY_STATUSES:
+                    response.read()
+                    error = f'HTTP {response.status}'
+                    continue
+                if response.status >= 400:
+                    response.read()
+                    raise ScrapeError(f'{pool.host}{pool.path}?{query} returned HTTP {response.status}')
+                opened = True
+                yield response
+                return
+        except (OSError, http.client.HTTPException) as e:
+            if opened:
+                raise ScrapeError(f'{pool.host}{pool.path}?{query} failed mid-page: {e}') from e
+            error = e
+    raise ScrapeError(f'{pool.host}{pool.path}?{query} failed after {retries + 1} attempts: {error}')
 
-        nidx = info.find(uid.course_idx, cidx + 1)
-        cnum = info[nidx + 10:nidx + 16]
-        cnum = strip(cnum)
 
-        course_availability[ctitle + ' ' + cnum] = availability
+def stream_listing(pool: ConnectionPool, query: str, headers: Optional[dict] = None,
+                   retries: int = SCRAPE_RETRIES, backoff: float = SCRAPE_BACKOFF,
+                   chunk_size: int = LISTING_CHUNK_SIZE) -> Iterator[bytes]:
+    """One listing page's body in chunks as they arrive off the socket"""
+    with open_listing(pool, query, headers, retries, backoff) as response:
+        while True:
+            chunk = response.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
 
-        sidx = html.find(uid.stable, eidx)
-        eidx = html.find(uid.estable, sidx)
 
-    return course_availability
+def iter_avail_listings(chunks: Iterable[bytes],
+                        uid: UCIScaperIdentifier = UCIScaperIdentifier()) -> Iterator[Tuple[str, List[str]]]:
+    """(course, sessions) for every course on a listing page, in a single pass over its chunks.
 
+    The page is a PHP var_dump: each course runs from its id field to its
+    description field, the second and third strings after the id are its
+    department and number, and its sessions are those named before the cores
+    field. The markers are found in page order, each search starting where
+    the last one ended, and only the unread end of the last chunk is kept.
+    """
+    start, cores, end = (marker.encode(uid.decoder) for marker in (uid.stable, uid.avail, uid.estable))
+    string = re.compile(rb'%s\d+\) "([^"]*)"' % re.escape(uid.course_idx.encode(uid.decoder)))
+    session_names = [s.encode(uid.decoder) for s in uid.sessions]
+    offered = {}  # Which session names a record mentions -> its session list
 
-def scape_save_csv(file_path: str, data: dict) -> None:
-    for k, v in data.items():
-        data[k] = '+'.join(v)
+    buf = b''
+    for chunk in chunks:
+        buf += chunk
+        pos = 0
+        while True:
+            sidx = buf.find(start, pos)
+            aidx = buf.find(cores, sidx) if sidx != -1 else -1
+            eidx = buf.find(end, aidx) if aidx != -1 else -1
+            if eidx == -1:
+                break
+
+            fields = buf[sidx + len(start):aidx]
+            strings = string.findall(fields)
+            if len(strings) >= 3:
+                mentioned = tuple(map(fields.__contains__, session_names))
+                sessions = offered.get(mentioned)
+                if sessions is None:
+                    sessions = offered[mentioned] = [s for s, named in zip(uid.sessions, mentioned) if named]
+                yield (b'%s %s' % (strings[1].strip(), strings[2].strip())).decode(uid.decoder), list(sessions)
+            pos = eidx + len(end)
 
-    df = pd.DataFrame(data.items(), columns=['Course', 'Availability'])
-    df.to_csv(file_path, index=False)
+        # Keep the unfinished record, or just enough to complete a split id marker
+        if sidx == -1:
+            pos = max(pos, len(buf) - len(start) + 1)
+        else:
+            pos = sidx
+        buf = buf[pos:]
+
+
+def parse_avail_listings(page: bytes, uid: UCIScaperIdentifier = UCIScaperIdentifier()) -> dict:
+    return dict(iter_avail_listings([page], uid))
+
+
+def scrape_cached_listing(pool: ConnectionPool, query: str, cache: ListingCache,
+                          uid: UCIScaperIdentifier = UCIScaperIdentifier()) -> dict:
+    """Revalidate a cached listing page, parsing it again only when its content changed"""
+    entry = cache.get(query)
+    with open_listing(pool, query, cache.conditional_headers(entry)) as response:
+        if response.status == 304 and entry is not None:
+            response.read()
+            cache.count('not_modified')
+            return entry.courses
+
+        spooled, sha256 = cache.spool(query, iter(lambda: response.read(LISTING_CHUNK_SIZE), b''))
+        etag = response.getheader('ETag')
+        last_modified = response.getheader('Last-Modified')
+
+    if entry is not None and entry.sha256 == sha256:
+        # Same bytes without validators (or with new ones), the old parse still holds
+        cache.count('unchanged')
+        courses = entry.courses
+    else:
+        cache.count('changed')
+        courses = dict(iter_avail_listings(cache.read_spooled(spooled), uid))
+    cache.put(query, CachedListing(etag, last_modified, sha256, courses), spooled)
+    return courses
+
+
+def scrape_avail_listings(year: int, department: str, level: str = 'ALL', program: str = 'ALL',
+                          uid: UCIScaperIdentifier = UCIScaperIdentifier(),
+                          pool: Optional[ConnectionPool] = None,
+                          cache: Optional[ListingCache] = None) -> dict:
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(uid.url_link, size=1)
+    query = listing_query(year, department, level, program)
+    try:
+        if cache is not None:
+            return scrape_cached_listing(pool, query, cache, uid)
+        return dict(iter_avail_listings(stream_listing(pool, query), uid))
+    finally:
+        if own_pool:
+            pool.close()
+
+
+def scrape_listings(years: Iterable[int], departments: Iterable[str], level: str = 'ALL',
+                    program: str = 'ALL', workers: int = SCRAPE_WORKERS,
+                    uid: UCIScaperIdentifier = UCIScaperIdentifier(),
+                    cache: Optional[ListingCache] = None) -> Dict[Tuple[int, str], dict]:
+    """Scrape every (year, department) listing with `workers` threads over pooled connections.
+
+    With a `cache`, pages are revalidated with conditional requests and only
+    re-parsed when they changed. Listings that still fail after the retries
+    are reported and left out.
+    """
+    jobs = [(year, department) for year in years for department in departments]
+    pool = ConnectionPool(uid.url_link, size=workers)
+    listings = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(scrape_avail_listings, year, department, level, program, uid, pool, cache): (year, department)
+                for year, department in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    listings[futures[future]] = future.result()
+                except ScrapeError as e:
+                    print(f'[Scraper] {e}')
+    finally:
+        pool.close()
+
+    return {job: listings[job] for job in jobs if job in listings}
+
+
+def merge_listings(listings: Iterable[dict], uid: UCIScaperIdentifier = UCIScaperIdentifier()) -> dict:
+    """One availability dict from several listings, with a course's sessions combined"""
+    merged = {}
+    for listing in listings:
+        for course, sessions in listing.items():
+            merged.setdefault(course, set()).update(sessions)
+    return {course: [s for s in uid.sessions if s in sessions] for course, sessions in merged.items()}
+
+
+def scape_save_csv(file_path: str, data: dict) -> None:
+    write_availability_csv(file_path, data)
 
 
 def scape_read_csv(file_path: str) -> dict:
-    df = pd.read_csv(file_path)
-    course_dict = {}
+    return read_availability_csv(file_path)
+
+
+def scape_update_csv(file_path: str, data: dict, replace: bool = False) -> dict:
+    """Write the courses in `data` whose sessions differ from the CSV; returns those changes.
 
-    for _, row in df.iterrows():
-        course_id = row['Course']
-        availability = row['Availability']
-        course_dict[course_id] = [] if pd.isnull(availability) else availability.split('+')
+    The file is left untouched (mtime included, so the catalog and plan cache
+    stay warm) when nothing changed. With `replace`, courses missing from
+    `data` are dropped, and reported with sessions None.
+    """
+    current = scape_read_csv(file_path) if os.path.exists(file_path) else {}
+    changes = {course: sessions for course, sessions in data.items() if current.get(course) != sessions}
+    if replace:
+        changes.update((course, None) for course in current if course not in data)
 
-    return course_dict
+    if changes:
+        for course, sessions in changes.items():
+            if sessions is None:
+                del current[course]
+            else:
+                current[course] = sessions
+        scape_save_csv(file_path, current)
+    return changes
 
 
 
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+This script adds academic years to the availability history store the planner
+predicts future offerings from (see availability_history.py), either from
+availability CSVs saved in past years or by scraping the listing site.
+
+    python scripts/build_availability_history.py --csv 2022=archive/2022.csv 2023=archive/2023.csv
+    python scripts/build_availability_history.py --scrape 2019 2020 2021 2022 2023 2024
+    python scripts/build_availability_history.py --show 2025 2026
+"""
+import argparse
+import os
+import sys
+
+# Add the parent directory to the path so we can import the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from availability_history import AvailabilityHistory, predicted_availability
+from catalog import AVAILABILITY_HISTORY_PATH
+from listing_cache import ListingCache
+from scraper import merge_listings, scape_read_csv, scrape_listings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', nargs='+', default=[], metavar='YEAR=PATH', help="availability CSVs by year")
+    parser.add_argument('--scrape', type=int, nargs='+', default=[], metavar='YEAR', help="years to scrape")
+    parser.add_argument('--departments', nargs='+', default=['ALL'])
+    parser.add_argument('--show', type=int, nargs='+', default=[], metavar='YEAR',
+                        help="print how many courses are expected to run in these years")
+    parser.add_argument('--output', default=AVAILABILITY_HISTORY_PATH)
+    args = parser.parse_args()
+
+    history = AvailabilityHistory.load(args.output) if os.path.exists(args.output) else AvailabilityHistory()
+
+    years = {}
+    for entry in args.csv:
+        year, _, path = entry.partition('=')
+        years[int(year)] = scape_read_csv(path)
+    if args.scrape:
+        listings = scrape_listings(args.scrape, args.departments, cache=ListingCache())
+        for year in args.scrape:
+            scraped = [listing for (y, _), listing in listings.items() if y == year]
+            if len(scraped) < len(args.departments):
+                sys.exit(f"Error: could not scrape every listing for {year}, {args.output} left unchanged")
+            years[year] = merge_listings(scraped)
+
+    for year, availability in sorted(years.items()):
+        history.add_year(year, availability)
+        print(f"{year}: {len(availability)} courses")
+    if years:
+        history.save(args.output)
+        print(f"Wrote {args.output} ({os.path.getsize(args.output)} bytes, {len(history)} courses, "
+              f"years {', '.join(map(str, history.years.tolist()))})")
+
+    for year, availability in zip(args.show, predicted_availability(history, args.show)):
+        by_count = {}
+        for sessions in availability.values():
+            by_count[len(sessions)] = by_count.get(len(sessions), 0) + 1
+        print(f"{year}: {len(availability)} courses expected, "
+              + ', '.join(f"{by_count[n]} in {n} session(s)" for n in sorted(by_count)))
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+"""
+This script compiles the prerequisite JSON, the availability CSV and the
+derived DAGs into the binary catalog artifact the backend memory-maps at
+startup (see catalog_artifact.py).
+
+    python scripts/build_catalog_artifact.py [output path]
+"""
+import os
+import sys
+
+# Add the parent directory to the path so we can import the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import build_catalog_snapshot
+from catalog_artifact import CATALOG_ARTIFACT_PATH, load_catalog_artifact, write_catalog_artifact
+
+def build_artifact(path=CATALOG_ARTIFACT_PATH):
+    snapshot = build_catalog_snapshot()
+    digest = write_catalog_artifact(snapshot, path)
+
+    # Read it back so a bad artifact fails the build instead of the first request
+    loaded = load_catalog_artifact(path)
+    if (dict(loaded.availability) != dict(snapshot.availability)
+            or dict(loaded.prereq_dag) != dict(snapshot.prereq_dag)
+            or loaded.prereq_rules != snapshot.prereq_rules):
+        raise SystemExit(f"Error: {path} does not round-trip to the source catalog")
+
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes, {len(snapshot.graph)} courses, "
+          f"catalog version {snapshot.version}, sha256 {digest[:16]})")
+
+if __name__ == "__main__":
+    build_artifact(*sys.argv[1:2])
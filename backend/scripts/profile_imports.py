@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+This script reports where cold-start time goes: it creates the Flask app in a
+fresh interpreter under `python -X importtime`, then prints the slowest
+imports (cumulative and self time per module) and the total startup time.
+
+With --budget-ms it exits with status 1 when startup exceeds the budget, so
+CI or a test can enforce a cold-start budget:
+
+    python scripts/profile_imports.py --top 20 --budget-ms 800
+    VERCEL=1 python scripts/profile_imports.py --budget-ms 600
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START = """
+import contextlib, io, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import create_app
+    create_app()
+print(time.perf_counter() - start)
+"""
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int        # Time spent in the module's own body
+    cumulative_us: int  # Including everything it imported
+    depth: int          # Nesting level in the import tree (0 = imported by the entry script)
+
+
+class ColdStartProfile(NamedTuple):
+    total_ms: float
+    imports: List[ImportTiming]
+
+
+def profile_cold_start(statement: str = COLD_START) -> ColdStartProfile:
+    """Run `statement` in a fresh interpreter and collect its -X importtime report"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+
+    return ColdStartProfile(float(result.stdout.split()[-1]) * 1000, imports)
+
+
+def print_report(profile: ColdStartProfile, top: int = 15) -> None:
+    print(f"{'module':<48} {'cumulative ms':>14} {'self ms':>9}")
+    for timing in sorted(profile.imports, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        print(f"{'  ' * min(timing.depth, 4) + timing.module:<48} "
+              f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}")
+    print(f"\n{len(profile.imports)} modules imported, create_app cold start {profile.total_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15, help="number of modules to list")
+    parser.add_argument('--budget-ms', type=float, default=None, help="fail when cold start exceeds this")
+    args = parser.parse_args()
+
+    profile = profile_cold_start()
+    print_report(profile, args.top)
+
+    if args.budget_ms is not None and profile.total_ms > args.budget_ms:
+        print(f"Cold start {profile.total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
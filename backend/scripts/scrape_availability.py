@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+This script scrapes the course listing site for several years and departments
+in parallel and writes the combined availability CSV the planner reads.
+
+Pages are cached on disk and revalidated with conditional requests, and the
+CSV is only rewritten when a course's sessions changed, so a repeated run
+against an unchanged site downloads and writes next to nothing.
+
+    python scripts/scrape_availability.py --years 2024 --departments ALL
+    python scripts/scrape_availability.py --years 2023 2024 --departments CS INF ICS --workers 4
+    python scripts/scrape_availability.py --url http://127.0.0.1:8765/ugrad_courses/listing-course.php
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the app
+sys.path.append(BACKEND_DIR)
+
+from listing_cache import LISTING_CACHE_DIR, ListingCache
+from scraper import SCRAPE_WORKERS, UCIScaperIdentifier, merge_listings, scape_update_csv, scrape_listings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, nargs='+', required=True)
+    parser.add_argument('--departments', nargs='+', default=['ALL'])
+    parser.add_argument('--level', default='ALL')
+    parser.add_argument('--program', default='ALL')
+    parser.add_argument('--workers', type=int, default=SCRAPE_WORKERS, help="concurrent requests")
+    parser.add_argument('--url', default=UCIScaperIdentifier().url_link, help="listing page to scrape")
+    parser.add_argument('--output', default=os.path.join(BACKEND_DIR, 'courses_availability.csv'))
+    parser.add_argument('--replace', action='store_true', help="drop courses no longer listed from the CSV")
+    parser.add_argument('--cache-dir', default=LISTING_CACHE_DIR, help="where raw pages are cached")
+    parser.add_argument('--no-cache', action='store_true', help="download and parse every page")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cache = None if args.no_cache else ListingCache(args.cache_dir)
+    listings = scrape_listings(args.years, args.departments, args.level, args.program,
+                               workers=args.workers, uid=UCIScaperIdentifier(url_link=args.url), cache=cache)
+    expected = len(args.years) * len(args.departments)
+    if len(listings) < expected:
+        sys.exit(f"Error: {expected - len(listings)} of {expected} listings failed, {args.output} left unchanged")
+
+    availability = merge_listings(listings.values())
+    changes = scape_update_csv(args.output, availability, replace=args.replace)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"{stats['notModified']} listings not modified, {stats['unchanged']} unchanged, "
+              f"{stats['changed']} new or changed")
+    print(f"{len(changes)} of {len(availability)} courses changed in {args.output} "
+          f"({len(listings)} listings, {time.perf_counter() - start:.1f}s)")
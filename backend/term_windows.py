@@ -0,0 +1,190 @@
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from course_graph import ClosureIndex
+
+
+TERM_WINDOWS_CACHE_SIZE = 256
+
+_windows_cache = OrderedDict()
+_windows_lock = threading.Lock()
+
+
+class TermWindows(NamedTuple):
+    """Term index window of every course id for one planning setup.
+
+    Term ``t`` is session ``t % len(sessions)`` of year ``t // len(sessions)``.
+    ``earliest[i]`` is the first term course ``i`` can be taken in given its
+    offered sessions and prerequisite rule (``n_terms`` if it never can, -1 if
+    already done). ``latest[i]`` is the last offered term that still leaves
+    room for every course that needs it; ``latest - earliest`` is its slack
+    on the critical path.
+    """
+    n_terms: int
+    earliest: array
+    latest: array
+
+    def feasible(self, i: int) -> bool:
+        return self.earliest[i] < self.n_terms
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+_members_cache = OrderedDict()
+
+
+def _rule_members(rules: Sequence[Tuple[int, ...]]) -> List[Tuple[Tuple[int, ...], ...]]:
+    # Clause bitmasks decoded to id tuples once per rules table; bit scans of
+    # catalog-wide masks are the slow part of a window pass
+    with _windows_lock:
+        entry = _members_cache.get(id(rules))
+        if entry is not None and entry[0] is rules:
+            return entry[1]
+
+    members = [tuple(tuple(_bits(clause)) for clause in rule) for rule in rules]
+    with _windows_lock:
+        _members_cache[id(rules)] = (rules, members)
+        while len(_members_cache) > 4:
+            _members_cache.popitem(last=False)
+    return members
+
+
+def compute_term_windows(closure: ClosureIndex,
+                         rules: Sequence[Tuple[int, ...]],
+                         availability: Mapping[str, Sequence[str]],
+                         sessions: Sequence[str],
+                         planned_years: int,
+                         done: Iterable[str] = (),
+                         placed: Mapping[str, int] = None) -> TermWindows:
+    """Earliest and latest term of every course in one pass each way over the topological order.
+
+    Only courses in `availability` can be scheduled; `done` courses are
+    finished before term 0 and `placed` pins courses to a term index (e.g.
+    fixed core courses). Unit caps are ignored, so `earliest` is a lower
+    bound on any plan the planner can build from the same inputs.
+    """
+    graph = closure.graph
+    n = len(graph)
+    n_sessions = len(sessions)
+    n_terms = planned_years * n_sessions
+    session_idx = {s: k for k, s in enumerate(sessions)}
+
+    # Per offered-session pattern, how far a term residue is from the next and previous
+    # offered session (n_terms when never offered)
+    patterns = {}
+
+    def pattern(course_sessions: Sequence[str]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        key = tuple(course_sessions or ())
+        tables = patterns.get(key)
+        if tables is None:
+            idxs = {session_idx[s] for s in key if s in session_idx}
+            ahead = tuple(min(((k - r) % n_sessions for k in idxs), default=n_terms) for r in range(n_sessions))
+            behind = tuple(min(((r - k) % n_sessions for k in idxs), default=n_terms) for r in range(n_sessions))
+            tables = patterns[key] = (ahead, behind)
+        return tables
+
+    never = pattern(())
+    offered = [never] * n
+    for course, course_sessions in availability.items():
+        i = graph.id_of(course)
+        if i >= 0:
+            offered[i] = pattern(course_sessions)
+
+    earliest = array('i', [n_terms]) * n
+    fixed = bytearray(n)
+    for course in done:
+        i = graph.id_of(course)
+        if i >= 0:
+            earliest[i] = -1
+            fixed[i] = 1
+    for course, term in (placed or {}).items():
+        i = graph.id_of(course)
+        if i >= 0:
+            earliest[i] = term
+            fixed[i] = 1
+
+    def first_offered_after(i: int, ready: int) -> int:
+        # First term after `ready` in one of the course's sessions
+        start = ready + 1
+        return min(start + offered[i][0][start % n_sessions], n_terms)
+
+    members = _rule_members(rules)
+
+    def relax(i: int) -> int:
+        ready = -1
+        rule = members[i]
+        if rule:
+            ready = min(max((earliest[m] for m in clause), default=-1) for clause in rule)
+        return n_terms if ready >= n_terms else first_offered_after(i, ready)
+
+    for i in closure.order:
+        if not fixed[i]:
+            earliest[i] = relax(i)
+
+    # Courses on an edge cycle can still be reachable through an OR clause; iterate to a fixed point
+    stuck = [i for i in range(n) if closure.rank[i] >= len(closure.order) and not fixed[i]]
+    changed = True
+    while changed:
+        changed = False
+        for i in stuck:
+            value = relax(i)
+            if value < earliest[i]:
+                earliest[i] = value
+                changed = True
+
+    # Latest: each course must come before every feasible course that needs it in all clauses
+    bound = array('i', [n_terms - 1]) * n
+    latest = array('i', [-1]) * n
+    for i in reversed(closure.order + stuck):
+        if fixed[i]:
+            latest[i] = earliest[i]
+        elif earliest[i] < n_terms:
+            # Last offered term at or before the bound
+            latest[i] = max(-1, bound[i] - offered[i][1][bound[i] % n_sessions])
+        # Done courses put no deadline on their prerequisites
+        if not 0 <= earliest[i] < n_terms or not members[i]:
+            continue
+        necessary = set(members[i][0]).intersection(*members[i][1:])
+        for p in necessary:
+            bound[p] = min(bound[p], latest[i] - 1)
+
+    return TermWindows(n_terms, earliest, latest)
+
+
+def get_term_windows(catalog, sessions: Sequence[str], planned_years: int,
+                     completed: Iterable[str] = (), offered: Optional[Iterable[str]] = None,
+                     placed: Mapping[str, int] = None) -> TermWindows:
+    """compute_term_windows for a catalog snapshot, cached per planning setup.
+
+    `offered` limits scheduling to those courses (e.g. a request's electives);
+    None means every course in the catalog's availability.
+    """
+    completed = frozenset(completed)
+    offered = frozenset(offered) if offered is not None else None
+    key = (catalog.version, tuple(sessions), planned_years, completed, offered,
+           frozenset((placed or {}).items()))
+
+    with _windows_lock:
+        windows = _windows_cache.get(key)
+        if windows is not None:
+            _windows_cache.move_to_end(key)
+            return windows
+
+    availability = catalog.availability
+    if offered is not None:
+        availability = {c: availability[c] for c in offered if c in availability}
+    windows = compute_term_windows(catalog.closure, catalog.prereq_rules, availability,
+                                   sessions, planned_years, completed, placed)
+
+    with _windows_lock:
+        _windows_cache[key] = windows
+        while len(_windows_cache) > TERM_WINDOWS_CACHE_SIZE:
+            _windows_cache.popitem(last=False)
+    return windows
@@ -36,7 +36,7 @@ if __name__ == '__main__':
 
 
 # TODO:
-# [ ] Display multiple possible schedules
+# [x] Display multiple possible schedules
 
 # [ ] Check for Summer classes, current scape doesn't include them
 # [ ] Ability to remove quarters, e.g. Remove Winter
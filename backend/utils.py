@@ -1,8 +1,8 @@
-from typing import Type
+from typing import Dict, List, NamedTuple, Type
 from collections import deque
-from functools import lru_cache
 from scraper import scape_read_csv
 from planner import CoursePlanner
+from course_graph import CourseGraph, compile_course_graph, order_course_graph
 
 
 
@@ -10,21 +10,53 @@ def load_availability(path: str) -> dict:
     return scape_read_csv(path)
 
 
+def _as_graph(dag) -> CourseGraph:
+    # Prerequisites that are not keys of a dict DAG become courses without prerequisites
+    return dag if isinstance(dag, CourseGraph) else compile_course_graph({}, dag)
+
+
+class DagOrder(NamedTuple):
+    order: List[str]              # Every course after all of its prerequisites
+    levels: Dict[str, int]        # Longest prerequisite chain below each ordered course
+    cycles: List[List[str]]       # Prerequisite cycles; courses behind them are left out of order
+
+
+def order_dag(dag) -> DagOrder:
+    """Topological order, depth levels and cycles of a prerequisite DAG in one linear pass"""
+    graph = _as_graph(dag)
+    result = order_course_graph(graph)
+    codes = graph.codes
+    return DagOrder(
+        order=[codes[i] for i in result.order],
+        levels={codes[i]: result.levels[i] for i in result.order},
+        cycles=[[codes[i] for i in cycle] for cycle in result.cycles],
+    )
+
+
 def topological_sort(dag: dict) -> dict:
-    @lru_cache(maxsize=10)
-    def dfs(course: str) -> None:
-        visited.add(course)
-        for prereq in dag[course]:
-            if prereq not in visited:
-                dfs(prereq)
-        topo_order[course] = dag[course]
-
-    visited = set()
+    return _topological_sort_graph(_as_graph(dag))
+
+
+def _topological_sort_graph(graph: CourseGraph) -> dict:
+    # Same post-order as topological_sort, walked over integer ids with an explicit stack
+    visited = bytearray(len(graph))
     topo_order = {}
 
-    for course in dag:
-        if course not in visited:
-            dfs(course)
+    for root in range(len(graph)):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        stack = [(root, iter(graph.prereqs(root)))]
+        while stack:
+            course, prereqs = stack[-1]
+            for prereq in prereqs:
+                if not visited[prereq]:
+                    visited[prereq] = 1
+                    stack.append((prereq, iter(graph.prereqs(prereq))))
+                    break
+            else:
+                stack.pop()
+                topo_order[graph.codes[course]] = [graph.codes[p] for p in graph.prereqs(course)]
 
     return topo_order
 
@@ -69,46 +101,74 @@ def topological_sort(dag: dict) -> dict:
 
 
 def dag_leveler(dag) -> list:
-    def bfs(adj_list: dict) -> dict:
-        levels = {}
-        visited = set()
-        q = deque()
-
-        snode = next(iter(adj_list.keys()))
-        q.append((snode, 0))  # Add the start node with level 0
-        visited.add(snode)
-        levels[snode] = 0
-
-        while q:
-            node, i = q.popleft()
-            for n in adj_list[node]:
-                if n not in visited:
-                    q.append((n, i + 1))
-                    visited.add(n)
-                    levels[n] = i + 1
-        return levels
-    
-    mult_dag = []
-    al_copy = dag.copy()
-
-    for i, (k, v) in enumerate(dag.items()):
-        mult_dag.append(bfs(al_copy))
-        al_copy.pop(k)
-        al_copy[k] = v
-        if i > len(dag):
-            break
-
-    idxs = []
-    for i, d1 in enumerate(mult_dag):
-        for j, d2 in enumerate(mult_dag):
-            if i == j:
-                continue
-            
-            if set(d1.keys()).issubset(set(d2.keys())):
-                idxs.append(i)
-                break
-
-    for idx in reversed(idxs):
-        mult_dag.pop(idx)
-
-    return mult_dag
\ No newline at end of file
+    """Split a prerequisite DAG into its connected courses and level each group.
+
+    Returns one {course: level} dict per weakly connected component, in order
+    of each component's first course. Level 0 holds the courses nothing
+    depends on, and every other course sits one level below its deepest
+    dependent (longest path), so each prerequisite is drawn below the courses
+    that need it. Components come from union-find and levels from a single
+    Kahn pass over dependents, O(V + E) overall. Courses on or behind a cycle
+    sit one level below their deepest leveled dependent.
+    """
+    graph = _as_graph(dag)
+    n = len(graph)
+
+    # Union-find over prerequisite edges, with path halving and union by size
+    parent = list(range(n))
+    size = [1] * n
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(n):
+        for p in graph.prereqs(i):
+            a, b = find(i), find(p)
+            if a != b:
+                if size[a] < size[b]:
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+
+    # Longest path from the top: a course is leveled once all of its dependents are
+    remaining = [graph.forward_offsets[i + 1] - graph.forward_offsets[i] for i in range(n)]
+    levels = [0] * n
+    queue = deque(i for i in range(n) if remaining[i] == 0)
+    leveled = bytearray(n)
+    while queue:
+        i = queue.popleft()
+        leveled[i] = 1
+        for p in graph.prereqs(i):
+            levels[p] = max(levels[p], levels[i] + 1)
+            remaining[p] -= 1
+            if remaining[p] == 0:
+                queue.append(p)
+
+    # Cycles never drain; place them under whatever was leveled above them
+    for i in range(n):
+        if not leveled[i]:
+            leveled[i] = 1
+            for p in graph.prereqs(i):
+                if not leveled[p]:
+                    levels[p] = max(levels[p], levels[i] + 1)
+
+    # One dict per component, filled level by level so each lists its courses top-down
+    components = {}
+    result = []
+    for i in range(n):
+        root = find(i)
+        if root not in components:
+            components[root] = len(result)
+            result.append({})
+
+    buckets = [[] for _ in range(max(levels, default=-1) + 1)]
+    for i in range(n):
+        buckets[levels[i]].append(i)
+    for level, courses in enumerate(buckets):
+        for i in courses:
+            result[components[find(i)]][graph.codes[i]] = level
+
+    return result
@@ -110,7 +110,7 @@ const services = {
   planner: {
     generatePlan: (planData) => api.post('/planner/generate', planData),
     getCourseAvailability: () => api.get('/planner/course-availability'),
-    getCompletedSuggestions: () => api.get('/planner/completed-suggestions'),
+    getCompletedSuggestions: (prefix, limit) => api.get('/planner/completed-suggestions', { params: { prefix, limit } }),
     getCoursePrereqs: () => api.get('/planner/course-prerequisites') // Added this line
   }
 };